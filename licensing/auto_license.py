@@ -1,10 +1,18 @@
 #!/usr/bin/env python3
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as dt
+import difflib
+from fnmatch import fnmatch
+import hashlib
+import json
 import os
 from pathlib import Path
 import re
+import shutil
+import subprocess
 import sys
+import tempfile
 
 
 SCRIPT_DIR = Path(__file__).parent.resolve()
@@ -35,7 +43,67 @@ COMMENT_STYLES = {
     ".go": "//",
     # Rust
     ".rs": "//",
+    # C / C++ (more)
+    ".cc": "/*",
+    ".cxx": "/*",
+    ".hxx": "/*",
+    # C#
+    ".cs": "//",
+    # Kotlin / Scala / Groovy
+    ".kt": "//",
+    ".kts": "//",
+    ".scala": "//",
+    ".groovy": "//",
+    ".gradle": "//",
+    # JavaScript / TypeScript (more)
+    ".jsx": "//",
+    ".tsx": "//",
+    ".mjs": "//",
+    ".cjs": "//",
+    # Dart
+    ".dart": "//",
+    # Zig
+    ".zig": "//",
+    # Shell
+    ".sh": "#",
+    ".bash": "#",
+    ".zsh": "#",
+    # Config
+    ".yaml": "#",
+    ".yml": "#",
+    ".toml": "#",
+    # CMake
+    ".cmake": "#",
+    # Ruby / Perl / R
+    ".rb": "#",
+    ".pl": "#",
+    ".pm": "#",
+    ".r": "#",
+    # PowerShell
+    ".ps1": "#",
+    # Terraform / Nix
+    ".tf": "#",
+    ".nix": "#",
+    # Lua / SQL / Haskell
+    ".lua": "--",
+    ".sql": "--",
+    ".hs": "--",
 }
+# Files recognized by their whole name rather than their extension (checked first)
+COMMENT_STYLES_BY_FILENAME = {
+    "CMakeLists.txt": "#",
+    "Makefile": "#",
+    "Dockerfile": "#",
+}
+
+# If the one_liner file changes, this has to change too
+SPDX_MARKER = "SPDX-License-Identifier: MIT-NC"
+# Headers are always near the top of a file, so only this much has to be read to find an existing one
+HEADER_SCAN_SIZE = 4096
+# Bytes per copy call when streaming the rest of a file after its header
+COPY_CHUNK_SIZE = 1024 * 1024
+# Default location of the --incremental cache, inside the repo's .git directory so it's never committed
+DEFAULT_CACHE_FILENAME = os.path.join(".git", "auto_license_cache.json")
 
 README_LICENSE_TEXT_TEMPLATE = """
 {comment} License
@@ -55,6 +123,30 @@ def unquote(value: str) -> str:
     return value
 
 
+def register_comment_style(name: str, comment_style: str) -> None:
+    """Add or override a comment style. `name` starting with "." is a file extension, anything else a whole filename"""
+    if name.startswith("."):
+        COMMENT_STYLES[name.lower()] = comment_style
+    else:
+        COMMENT_STYLES_BY_FILENAME[name] = comment_style
+
+
+def load_comment_styles(filename: str | Path) -> None:
+    """Register the comment styles in a JSON file: an object of extension (".ext") or filename to comment style"""
+    with open(filename, "r", encoding="UTF-8") as handle:
+        comment_styles = json.load(handle)
+    if not isinstance(comment_styles, dict):
+        raise ValueError(f"Comment styles file must contain a JSON object: '{filename}'")
+    for name, comment_style in comment_styles.items():
+        register_comment_style(name, comment_style)
+
+
+def get_comment_style(filename: str) -> str | None:
+    if filename in COMMENT_STYLES_BY_FILENAME:
+        return COMMENT_STYLES_BY_FILENAME[filename]
+    return COMMENT_STYLES.get(os.path.splitext(filename)[1].lower())
+
+
 def load_file(filename: str | Path, encoding: str | None = "UTF-8") -> str | bytes:
     open_flags = "r" if encoding else "rb"
     kwargs = {"encoding": encoding} if encoding else {}
@@ -126,75 +218,162 @@ def load_license_templates() -> dict[Path, str]:
     return {filename: load_file(filename) for filename in load_license_filenames()}
 
 
-def insert_python_header(content, spdx_line):
-    """Insert SPDX header respecting shebang and module docstring"""
-    lines = content.splitlines(keepends=True)
+def _line_starts(lines: list[str]) -> list[int]:
+    starts = [0]
+    for line in lines:
+        starts.append(starts[-1] + len(line))
+    return starts
+
+
+def find_python_header_offset(prefix: str, complete: bool, spdx_line: str) -> tuple[int, str] | None:
+    """Where (character offset) and what to insert for a SPDX header, respecting shebang and module docstring.
+    `prefix` is the start of the file (all of it if `complete`). Returns None if more of the file is needed to decide
+    """
+    lines = prefix.splitlines(keepends=True)
+    if not complete and lines:
+        # The last line may be cut off
+        lines.pop()
     idx = 0
 
     # Skip shebang
     if lines and lines[0].startswith("#!"):
         idx = 1
+    if idx >= len(lines) and not complete:
+        return None
 
-    # Check for module docstring
+    # Check for module docstring. The header goes right after its first line
     docstring_match = re.match(r'\s*(["\']{3}|["\'])', lines[idx] if idx < len(lines) else "")
     if docstring_match:
-        quote = docstring_match.group(1)
-        for j in range(idx + 1, len(lines)):
-            if lines[j].strip().endswith(quote):
-                lines.insert(idx + 1, spdx_line + "\n")
-                return "".join(lines)
-        # fallback
-        lines.insert(idx + 1, spdx_line + "\n")
-        return "".join(lines)
-    lines.insert(idx, spdx_line + "\n")
-    return "".join(lines)
-
-
-def insert_block_comment_header(lines, spdx_line, comment_style):
+        idx += 1
+    return _line_starts(lines)[min(idx, len(lines))], spdx_line + "\n"
+
+
+def find_block_comment_header_offset(
+    prefix: str, complete: bool, spdx_line: str, comment_style: str
+) -> tuple[int, str] | None:
     """
-    Insert SPDX header inside existing top comment block if present, otherwise prepend.
-    Supports /* */ and // comments.
+    Where (character offset) and what to insert for a SPDX header: inside an existing top comment block if present,
+    otherwise prepended, after the shebang if there is one. Supports /* */ and single-line comments.
+    `prefix` is the start of the file (all of it if `complete`). Returns None if more of the file is needed to decide
     """
-    if not lines:
-        return spdx_line + "\n\n"
-
-    first_line = lines[0].lstrip()
+    lines = prefix.splitlines(keepends=True)
+    if not complete and lines:
+        # The last line may be cut off
+        lines.pop()
+    start = 0
+    # Skip shebang (e.g., `#!/usr/bin/env node`), which has to stay first. Not Rust's `#![...]` inner attributes
+    if lines and lines[0].startswith("#!") and not lines[0].startswith("#!["):
+        start = len(lines.pop(0))
+    if not lines and not complete:
+        return None
+
+    first_line = lines[0].lstrip() if lines else ""
     # Multi-line block comment
     if comment_style == "/*":
         if first_line.startswith("/*"):
             # Find closing */
             for i, line in enumerate(lines):
                 if "*/" in line:
-                    lines.insert(i, " " + spdx_line + "\n")
-                    return "".join(lines)
+                    return start + _line_starts(lines)[i], " " + spdx_line + "\n"
+            if not complete:
+                return None
         # No block, prepend with proper ending
-        return spdx_line + " */\n\n" + "".join(lines)
+        return start, spdx_line + " */\n\n"
     # Single-line comment style
     if first_line.startswith(comment_style):
         # Insert after first comment line
-        lines.insert(1, spdx_line + "\n")
-        return "".join(lines)
-    return spdx_line + "\n\n" + "".join(lines)
-
-
-def add_header_to_file(file_path, comment_style, spdx_line):
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+        return start + len(lines[0]), spdx_line + "\n"
+    return start, spdx_line + "\n\n"
 
-    # If the one_liner file changes, this has to change too
-    if "SPDX-License-Identifier: MIT-NC" in content:
-        return False
 
-    if file_path.endswith(".py"):
-        new_content = insert_python_header(content, spdx_line)
-    else:
-        lines = content.splitlines(keepends=True)
-        new_content = insert_block_comment_header(lines, spdx_line, comment_style)
-
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(new_content)
-
-    return True
+def copy_remainder(src, dst, offset: int) -> None:
+    """Copy `src` from byte `offset` to the end onto the end of `dst` (both binary files), in the kernel when
+    possible
+    """
+    dst.flush()
+    start = dst.tell()
+    if hasattr(os, "sendfile"):
+        try:
+            while sent := os.sendfile(dst.fileno(), src.fileno(), offset, COPY_CHUNK_SIZE):
+                offset += sent
+            dst.seek(0, os.SEEK_END)
+            return
+        except OSError:
+            # E.g., not supported between these files. Redo it the portable way
+            dst.seek(start)
+            dst.truncate()
+    src.seek(offset)
+    shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+
+
+def add_header_to_file(file_path, comment_style, spdx_line, dry_run: bool = False) -> str | None:
+    """Add the SPDX header to `file_path`. Only the start of the file is scanned to decide where it goes. The rest is
+    streamed into a temporary file that then replaces the original, so an interruption never leaves a truncated file.
+    Returns a unified diff of the change (not made if `dry_run`), or None if the file already had a header
+    """
+    prefix_size = HEADER_SCAN_SIZE
+    with open(file_path, "r", encoding="utf-8", newline="") as f:
+        prefix = f.read(prefix_size)
+        # If the one_liner file changes, SPDX_MARKER has to change too
+        if SPDX_MARKER in prefix:
+            return None
+        while True:
+            complete = len(prefix) < prefix_size
+            if file_path.endswith(".py"):
+                insertion = find_python_header_offset(prefix, complete, spdx_line)
+            else:
+                insertion = find_block_comment_header_offset(prefix, complete, spdx_line, comment_style)
+            if insertion:
+                break
+            # Rare: e.g., a very long opening comment block
+            prefix += f.read(prefix_size)
+            prefix_size *= 2
+            if SPDX_MARKER in prefix:
+                return None
+
+    offset, header = insertion
+    if offset and not prefix[:offset].endswith(("\n", "\r")):
+        # The file ends without a newline right where the header goes
+        header = "\n" + header
+    new_prefix = prefix[:offset] + header + prefix[offset:]
+    diff = "".join(
+        difflib.unified_diff(
+            prefix.splitlines(keepends=True),
+            new_prefix.splitlines(keepends=True),
+            fromfile=file_path,
+            tofile=file_path,
+        )
+    )
+    if dry_run:
+        return diff
+
+    # Write through symlinks (replacing the link itself would turn it into a regular file and leave the target alone)
+    real_path = os.path.realpath(file_path)
+    tmp_fd, tmp_filename = tempfile.mkstemp(
+        dir=os.path.dirname(real_path), prefix=f".{os.path.basename(real_path)}.", suffix=".tmp"
+    )
+    try:
+        with open(real_path, "rb") as src, os.fdopen(tmp_fd, "wb") as dst:
+            dst.write(new_prefix.encode("utf-8"))
+            copy_remainder(src, dst, len(prefix.encode("utf-8")))
+            dst.flush()
+            src_stat = os.fstat(src.fileno())
+            if hasattr(os, "fchown"):
+                try:
+                    os.fchown(dst.fileno(), src_stat.st_uid, src_stat.st_gid)
+                except PermissionError:
+                    # Only root can give a file away, so it ends up owned by us
+                    pass
+            # After the chown, which can clear setuid/setgid bits
+            shutil.copymode(real_path, tmp_filename)
+            os.fsync(dst.fileno())
+        os.replace(tmp_filename, real_path)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+
+    return diff
 
 
 def format_content(content: str, config_dict: dict) -> str:
@@ -204,7 +383,10 @@ def format_content(content: str, config_dict: dict) -> str:
     return content
 
 
-def update_readme(readme_filename: str | Path) -> None:
+def update_readme(readme_filename: str | Path, dry_run: bool = False) -> bool:
+    """Add a licensing section to the README if it doesn't have one. Returns whether it was (or, with `dry_run`,
+    would be) changed
+    """
     comment_chars_map = {
         ".adoc": ["=", "==", "==="],
         ".md": ["#"],
@@ -219,7 +401,11 @@ def update_readme(readme_filename: str | Path) -> None:
             for comment_char in comment_chars:
                 if line.lower().startswith(f"{comment_char} license"):
                     print(f"README file '{readme_filename}' already had a licensing section")
-                    return
+                    return False
+
+    if dry_run:
+        print(f"README file '{readme_filename}' would be updated with a licensing section")
+        return True
 
     # Put a licensing section at the end of the file
     with open(readme_filename, "a", encoding="UTF-8") as handle:
@@ -227,6 +413,102 @@ def update_readme(readme_filename: str | Path) -> None:
         handle.write("\n")
         handle.write(README_LICENSE_TEXT_TEMPLATE.format(comment=comment_chars[0]))
         print(f"README file '{readme_filename}' updated with a licensing section")
+    return True
+
+
+def load_gitignore_patterns(root: str | Path) -> list[str]:
+    """Patterns from the root .gitignore. Only the simple cases are handled: negations are ignored, and a trailing or
+    leading `/` is dropped
+    """
+    try:
+        lines = load_file(os.path.join(root, ".gitignore")).splitlines()
+    except OSError:
+        return []
+    patterns = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#") or line.startswith("!"):
+            continue
+        patterns.append(line.strip("/"))
+    return patterns
+
+
+def is_gitignored(rel_path: str, name: str, patterns: list[str]) -> bool:
+    return any(fnmatch(rel_path, pattern) or fnmatch(name, pattern) for pattern in patterns)
+
+
+def walk_repo(root: str | Path, skip_gitignored: bool = True):
+    """Yield (directory, filename) for every file in the repo, pruning `.git` and (optionally) gitignored paths so
+    they're never descended into
+    """
+    patterns = load_gitignore_patterns(root) if skip_gitignored else []
+    for dir_path, dirs, files in os.walk(root):
+        rel_dir = os.path.relpath(dir_path, root)
+        rel_dir = "" if rel_dir == "." else rel_dir
+        dirs[:] = [d for d in dirs if d != ".git" and not is_gitignored(os.path.join(rel_dir, d), d, patterns)]
+        for file in files:
+            if not is_gitignored(os.path.join(rel_dir, file), file, patterns):
+                yield dir_path, file
+
+
+def run_git(root: str | Path, *args: str) -> list[str]:
+    """Run a git command against the local repo at `root` and return the NUL-separated paths it prints"""
+    result = subprocess.run(["git", "-C", str(root), *args], capture_output=True, check=True)
+    return [path for path in result.stdout.decode("utf-8", errors="surrogateescape").split("\0") if path]
+
+
+def git_candidate_files(root: str | Path, changed_since: str | None = None, staged: bool = False):
+    """Yield (directory, filename) for files git knows about under `root`: every tracked file, or only the tracked
+    files changed (added, copied, modified, or renamed) since the `changed_since` ref, or only the staged ones.
+    Paths are relative to `root`
+    """
+    if staged:
+        paths = run_git(root, "diff", "--cached", "--name-only", "--relative", "--diff-filter=ACMR", "-z")
+    elif changed_since:
+        paths = run_git(root, "diff", "--name-only", "--relative", "--diff-filter=ACMR", "-z", changed_since, "--")
+    else:
+        paths = run_git(root, "ls-files", "--cached", "-z")
+    for path in paths:
+        file_path = os.path.join(root, path)
+        # E.g., deleted from the working tree without being staged
+        if os.path.isfile(file_path):
+            yield os.path.dirname(file_path), os.path.basename(file_path)
+
+
+def load_cache(cache_filename: str | Path, spdx_hash: str) -> dict[str, list[int]]:
+    """Path (relative to the repo root) to [mtime_ns, size] of files already processed. Empty if the cache was made
+    for a different header
+    """
+    try:
+        with open(cache_filename, "r", encoding="UTF-8") as handle:
+            cache = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("spdx_hash") != spdx_hash:
+        return {}
+    return cache.get("files", {})
+
+
+def save_cache(cache_filename: str | Path, spdx_hash: str, files: dict[str, list[int]]) -> None:
+    tmp_filename = f"{cache_filename}.tmp"
+    with open(tmp_filename, "w", encoding="UTF-8") as handle:
+        json.dump({"spdx_hash": spdx_hash, "files": files}, handle)
+    os.replace(tmp_filename, cache_filename)
+
+
+def stat_key(file_path: str) -> list[int]:
+    stat = os.stat(file_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def process_file(
+    file_path: str, comment_style: str, spdx_line: str, dry_run: bool = False
+) -> tuple[str, str | None, list[int]]:
+    """Worker for the pool: add the header if needed. Returns (file_path, diff of the change or None, stat key after
+    processing)
+    """
+    diff = add_header_to_file(file_path, comment_style, spdx_line, dry_run)
+    return file_path, diff, stat_key(file_path)
 
 
 def main() -> int:
@@ -238,7 +520,44 @@ def main() -> int:
                         help="Just add license files, don't modify other files with headers",
                         action="store_true")
     parser.add_argument("--no-git", help="Don't check for given directory being a git repo", action="store_true")
+    parser.add_argument("--jobs", help="Number of files to process in parallel", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--incremental",
+                        help="Skip files unchanged since the last --incremental run (by mtime and size)",
+                        action="store_true")
+    parser.add_argument("--cache-file", help=f"Cache for --incremental (default: ROOT/{DEFAULT_CACHE_FILENAME})",
+                        type=Path)
+    parser.add_argument("--include-gitignored", help="Also process files ignored by the root .gitignore",
+                        action="store_true")
+    parser.add_argument("--dry-run", help="Don't change anything, print diffs of the headers that would be added",
+                        action="store_true")
+    parser.add_argument("--check",
+                        help="Don't change anything, exit with 1 if anything is missing license info (for CI)",
+                        action="store_true")
+    parser.add_argument("--comment-styles", help="JSON file of extra extension/filename to comment style mappings",
+                        type=Path)
+    git_mode = parser.add_mutually_exclusive_group()
+    git_mode.add_argument("--git-tracked", help="Only process files tracked by git (instead of walking the tree)",
+                          action="store_true")
+    git_mode.add_argument("--git-changed", metavar="BASE_REF",
+                          help="Only process tracked files changed since BASE_REF (e.g., origin/main)")
+    git_mode.add_argument("--staged",
+                          help="Only process staged files (e.g., from a git pre-commit hook). Exits with 1 if it "
+                               "changed anything, so the commit stops until the changes are reviewed and staged",
+                          action="store_true")
+    git_mode.add_argument("--files", nargs="+", type=Path,
+                          help="Only process these files (e.g., as a pre-commit framework hook, which passes them). "
+                               "Exits with 1 if it changed anything, like other pre-commit fixers")
     parsed = parser.parse_args()
+    dry_run = parsed.dry_run or parsed.check
+    # As a hook, changing files has to fail the commit, or it goes ahead without them
+    fail_on_change = parsed.check or (not dry_run and (parsed.staged or bool(parsed.files)))
+
+    if parsed.comment_styles:
+        try:
+            load_comment_styles(parsed.comment_styles)
+        except (OSError, ValueError) as exc:
+            print(f"[!] Failed to load comment styles: {exc}", file=sys.stderr)
+            return 1
 
     one_liner_content = load_one_liner()
     config_env = load_config_env()
@@ -261,41 +580,91 @@ def main() -> int:
             print("[!] Root path is expected contain a .git sub-directory", file=sys.stderr)
             return 1
 
+    # Files to check for headers. Asked for up front so a git failure doesn't leave the repo half-updated
+    if parsed.files:
+        files = ((os.path.dirname(filename), os.path.basename(filename)) for filename in parsed.files)
+    elif parsed.git_tracked or parsed.git_changed or parsed.staged:
+        try:
+            files = list(git_candidate_files(parsed.root, parsed.git_changed, parsed.staged))
+        except (OSError, subprocess.CalledProcessError) as exc:
+            stderr = getattr(exc, "stderr", b"") or b""
+            print(f"[!] Failed to get files from git: {exc} {stderr.decode(errors='replace').strip()}", file=sys.stderr)
+            return 1
+    else:
+        files = walk_repo(parsed.root, skip_gitignored=not parsed.include_gitignored)
+
     # Copy license files to destination after filling in templates
+    changes_needed = 0
     license_file_templates = load_license_templates()
     for filename, content in license_file_templates.items():
         out_filename = parsed.root / os.path.basename(filename)
         if os.path.exists(out_filename):
             print(f"[+] License file already existed in directory '{parsed.root}': '{os.path.basename(filename)}'")
             continue
+        changes_needed += 1
+        if dry_run:
+            print(f"[+] Would create license file '{out_filename}'")
+            continue
         with open(out_filename, "w", encoding="UTF-8") as handle:
             handle.write(format_content(content, config_env))
         print(f"[+] Just created license file '{out_filename}'")
 
     if parsed.just_license_files:
-        return 0
+        return 1 if fail_on_change and changes_needed else 0
 
     # Update various files automatically - READMEs, source headers, etc.
-    spdx_lines_added = 0
-    for root, _, files in os.walk(parsed.root):
-        for file in files:
-            if file.lower().startswith("readme"):
-                update_readme(os.path.join(root, file))
-                continue
+    one_liner = format_content(one_liner_content, config_env)
+    spdx_hash = hashlib.sha256(one_liner.encode()).hexdigest()
+    cache_filename = None
+    cache = {}
+    if parsed.incremental:
+        cache_filename = parsed.cache_file or parsed.root / DEFAULT_CACHE_FILENAME
+        if not os.path.isdir(os.path.dirname(cache_filename) or "."):
+            print(f"[!] Directory for the cache file doesn't exist (try --cache-file): '{cache_filename}'",
+                  file=sys.stderr)
+            return 1
+        cache = load_cache(cache_filename, spdx_hash)
+
+    candidates = []
+    for root, file in files:
+        if file.lower().startswith("readme"):
+            if update_readme(os.path.join(root, file), dry_run):
+                changes_needed += 1
+            continue
 
-            ext = os.path.splitext(file)[1].lower()
-            if ext in COMMENT_STYLES:
-                file_path = os.path.join(root, file)
-                comment_style = COMMENT_STYLES[ext]
-                spdx_line = f"{comment_style} {format_content(one_liner_content, config_env)}"
-                if add_header_to_file(file_path, comment_style, spdx_line):
-                    spdx_lines_added += 1
-                    print(f"[+] Added SPDX header to: {file_path}")
-            elif parsed.verbose:
-                print(f"[_] File didn't match a known file extension: '{file}'")
+        comment_style = get_comment_style(file)
+        if comment_style:
+            file_path = os.path.join(root, file)
+            if cache and cache.get(os.path.relpath(file_path, parsed.root)) == stat_key(file_path):
+                continue
+            candidates.append((file_path, comment_style, f"{comment_style} {one_liner}", dry_run))
+        elif parsed.verbose:
+            print(f"[_] File didn't match a known file extension: '{file}'")
 
+    spdx_lines_added = 0
+    with ThreadPoolExecutor(max(1, parsed.jobs)) as pool:
+        for file_path, diff, file_stat_key in pool.map(lambda args: process_file(*args), candidates):
+            if diff is None:
+                cache[os.path.relpath(file_path, parsed.root)] = file_stat_key
+                continue
+            spdx_lines_added += 1
+            if parsed.check:
+                print(f"[!] Missing SPDX header: {file_path}")
+            elif parsed.dry_run:
+                print(diff, end="")
+            else:
+                print(f"[+] Added SPDX header to: {file_path}")
+                cache[os.path.relpath(file_path, parsed.root)] = file_stat_key
+
+    if cache_filename and not dry_run:
+        save_cache(cache_filename, spdx_hash, cache)
+
+    if dry_run:
+        changes_needed += spdx_lines_added
+        print(f"\n[+] Done! SPDX headers would be added to {spdx_lines_added} files.")
+        return 1 if fail_on_change and changes_needed else 0
     print(f"\n[+] Done! SPDX headers added to {spdx_lines_added} files.")
-    return 0
+    return 1 if fail_on_change and changes_needed + spdx_lines_added else 0
 
 
 if __name__ == "__main__":
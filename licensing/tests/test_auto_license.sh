@@ -16,6 +16,15 @@ REPODIR="$RESOURCESDIR/test_repo1"
 mkdir "$REPODIR/.git" || exit 1
 
 FAIL=0
+if python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE --check >/dev/null; then
+  printf "[!] TEST: Script failed to fail --check when headers were missing\n" >&2
+  FAIL=1
+fi
+python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE --dry-run >/dev/null
+if ! git diff --quiet -- "$REPODIR" || [ -n "$(find "$REPODIR" -maxdepth 1 -name "LICENSE*")" ]; then
+  printf "[!] TEST: Script changed files in --dry-run mode\n" >&2
+  FAIL=1
+fi
 if python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" 2>/dev/null; then
   printf "[!] TEST: Script failed to fail when project name not given\n" >&2
   FAIL=1
@@ -25,6 +34,28 @@ if ! python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE; then
   FAIL=1
 fi
 
+# Incremental mode: the first run fills the cache, the second shouldn't touch anything
+git checkout -- "$REPODIR" >/dev/null
+python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE --incremental --dry-run >/dev/null
+python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE --incremental --check >/dev/null
+if [ -f "$REPODIR/.git/auto_license_cache.json" ]; then
+  printf "[!] TEST: Script wrote the --incremental cache in --dry-run or --check mode\n" >&2
+  FAIL=1
+fi
+if ! python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE --incremental --jobs 4 | grep -q "added to 5 files"; then
+  printf "[!] TEST: Script failed to add headers in --incremental mode\n" >&2
+  FAIL=1
+fi
+if [ ! -f "$REPODIR/.git/auto_license_cache.json" ]; then
+  printf "[!] TEST: Script failed to write the --incremental cache\n" >&2
+  FAIL=1
+fi
+if ! python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE --incremental | grep -q "added to 0 files"; then
+  printf "[!] TEST: Script failed to skip unchanged files in --incremental mode\n" >&2
+  FAIL=1
+fi
+rm -f "$REPODIR/.git/auto_license_cache.json"
+
 rmdir "$REPODIR/.git" || exit 1
 
 if python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE; then
@@ -33,10 +64,58 @@ fi
 if ! python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE --no-git; then
   printf "[!] TEST: Script failed to respect --no-git flag\n" >&2
 fi
+if ! python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE --no-git --check >/dev/null; then
+  printf "[!] TEST: Script failed --check when everything was licensed\n" >&2
+  FAIL=1
+fi
+
+find "$REPODIR" -type f -name "LICENSE*" -delete
+git checkout -- "$RESOURCESDIR" >/dev/null
+
+# Git modes: nothing has changed since HEAD, but every tracked file is missing a header
+if ! python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE --no-git --git-changed HEAD --dry-run | grep -q "added to 0 files"; then
+  printf "[!] TEST: Script failed to only process changed files with --git-changed\n" >&2
+  FAIL=1
+fi
+if ! python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE --no-git --git-tracked --dry-run | grep -q "added to 5 files"; then
+  printf "[!] TEST: Script failed to process tracked files with --git-tracked\n" >&2
+  FAIL=1
+fi
 
+# Hook modes: --files (and --staged) fail when they change something, so the commit doesn't go ahead without it
+if python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE --no-git --files "$REPODIR/shebang_docstring.py" >/dev/null; then
+  printf "[!] TEST: Script failed to fail after adding headers with --files\n" >&2
+  FAIL=1
+fi
+if git diff --quiet -- "$REPODIR/shebang_docstring.py"; then
+  printf "[!] TEST: Script failed to add a header with --files\n" >&2
+  FAIL=1
+fi
+if ! python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE --no-git --files "$REPODIR/shebang_docstring.py" >/dev/null; then
+  printf "[!] TEST: Script failed with --files when nothing needed changing\n" >&2
+  FAIL=1
+fi
+if python3 "$SCRIPTDIR/../auto_license.py" "$REPODIR" -p YEE --no-git --check --files "$REPODIR/shebang_no_docstring.py" >/dev/null; then
+  printf "[!] TEST: Script failed to fail --check with --files when headers were missing\n" >&2
+  FAIL=1
+fi
 find "$REPODIR" -type f -name "LICENSE*" -delete
 git checkout -- "$RESOURCESDIR" >/dev/null
 
+# Shebangs stay on the first line for every comment style, or the scripts stop being executable
+SHEBANGDIR="$(mktemp -d)"
+printf '#!/usr/bin/env node\nconsole.log(1)\n' > "$SHEBANGDIR/cli.mjs"
+printf '#!/usr/bin/env lua\nprint(1)\n' > "$SHEBANGDIR/script.lua"
+python3 "$SCRIPTDIR/../auto_license.py" "$SHEBANGDIR" -p YEE --no-git --files "$SHEBANGDIR/cli.mjs" \
+  "$SHEBANGDIR/script.lua" >/dev/null
+for script in cli.mjs script.lua; do
+  if ! head -n 1 "$SHEBANGDIR/$script" | grep -q '^#!' || ! sed -n 2p "$SHEBANGDIR/$script" | grep -q "SPDX"; then
+    printf "[!] TEST: Script failed to put the header after the shebang of %s\n" "$script" >&2
+    FAIL=1
+  fi
+done
+rm -rf "$SHEBANGDIR"
+
 # New repo dir
 REPODIR="$RESOURCESDIR/test_repo2"
 
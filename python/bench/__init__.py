@@ -0,0 +1,176 @@
+"""Benchmark harness: timing, profiling, environment metadata, and comparison against a stored baseline.
+The benchmarks themselves are in `suites`. Run them with `python -m <package>.bench` (see `__main__`).
+"""
+
+import cProfile
+from dataclasses import asdict, dataclass, field
+from datetime import datetime as dt, UTC
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+
+# Fraction a benchmark may get slower than the baseline before it counts as a regression
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+DEFAULT_MIN_TIME_S = 0.2
+DEFAULT_MAX_ROUNDS = 1000
+MIN_ROUNDS = 3
+
+
+@dataclass
+class Benchmark:
+    """One benchmark. `func` runs a single round of `ops_per_round` operations (processing `bytes_per_round` bytes,
+    if that's meaningful). If `func` returns a float, that's taken as the round's time in seconds instead of the wall
+    time (for rounds that measure something else, e.g., a subprocess). `setup` runs once before the first round and
+    `teardown` once after the last, so benchmarks that are filtered out never acquire anything
+    """
+
+    name: str
+    func: Callable[[], object]
+    ops_per_round: int = 1
+    bytes_per_round: int | None = None
+    setup: Callable[[], object] | None = None
+    teardown: Callable[[], object] | None = None
+
+
+@dataclass
+class BenchResult:
+    """Result of a benchmark. Rates come from the fastest round. `skipped` is the reason a benchmark couldn't run
+    (e.g., a missing optional dependency), in which case there are no measurements
+    """
+
+    name: str
+    ops_per_s: float | None = None
+    bytes_per_s: float | None = None
+    best_round_s: float | None = None
+    mean_round_s: float | None = None
+    rounds: int = 0
+    ops_per_round: int = 0
+    peak_memory_bytes: int | None = None
+    profile_filename: str | None = None
+    skipped: str | None = None
+    extra: dict = field(default_factory=dict)
+
+
+def _profile_filename(profile_dir: str, name: str) -> str:
+    return os.path.join(profile_dir, re.sub(r"[^\w.-]+", "_", name) + ".prof")
+
+
+def run_benchmark(
+    bench: Benchmark,
+    min_time_s: float = DEFAULT_MIN_TIME_S,
+    max_rounds: int = DEFAULT_MAX_ROUNDS,
+    profile_dir: str | None = None,
+    trace_memory: bool = False,
+) -> BenchResult:
+    """Run `bench` for at least `min_time_s` (and at least `MIN_ROUNDS` rounds, at most `max_rounds`) after one warmup
+    round. Profiling (cProfile, to `profile_dir`) and memory tracing (tracemalloc peak) each get their own extra round
+    so they don't skew the timings
+    """
+    if bench.setup:
+        bench.setup()
+    try:
+        bench.func()
+        round_times = []
+        total = 0.0
+        while len(round_times) < max_rounds and (len(round_times) < MIN_ROUNDS or total < min_time_s):
+            start = time.perf_counter()
+            measured = bench.func()
+            round_times.append(measured if isinstance(measured, float) else time.perf_counter() - start)
+            total += round_times[-1]
+
+        result = BenchResult(
+            name=bench.name,
+            best_round_s=min(round_times),
+            mean_round_s=total / len(round_times),
+            rounds=len(round_times),
+            ops_per_round=bench.ops_per_round,
+        )
+        # Guard against rounds too fast for the clock
+        best = max(result.best_round_s, 1e-9)
+        result.ops_per_s = bench.ops_per_round / best
+        if bench.bytes_per_round is not None:
+            result.bytes_per_s = bench.bytes_per_round / best
+
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler = cProfile.Profile()
+            profiler.runcall(bench.func)
+            result.profile_filename = _profile_filename(profile_dir, bench.name)
+            profiler.dump_stats(result.profile_filename)
+
+        if trace_memory:
+            already_tracing = tracemalloc.is_tracing()
+            if not already_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            bench.func()
+            result.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+            if not already_tracing:
+                tracemalloc.stop()
+        return result
+    finally:
+        if bench.teardown:
+            bench.teardown()
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "-C", os.path.dirname(os.path.abspath(__file__)), "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def environment_metadata() -> dict:
+    """What the results depend on besides the code: interpreter, machine, and the commit benchmarked"""
+    return {
+        "timestamp": dt.now(UTC).isoformat(),
+        "python_version": platform.python_version(),
+        "python_implementation": platform.python_implementation(),
+        "python_executable": sys.executable,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": _git_commit(),
+    }
+
+
+def results_to_json(results: list[BenchResult], metadata: dict | None = None) -> dict:
+    return {
+        "metadata": metadata if metadata is not None else environment_metadata(),
+        "results": [asdict(result) for result in results],
+    }
+
+
+def compare_to_baseline(
+    results: list[BenchResult], baseline: dict, threshold: float = DEFAULT_REGRESSION_THRESHOLD
+) -> list[str]:
+    """Descriptions of every benchmark whose rate dropped more than `threshold` (a fraction) below the baseline (a
+    previous `results_to_json`). Benchmarks missing from either side, or skipped, aren't compared
+    """
+    baseline_rates = {
+        result["name"]: result["ops_per_s"] for result in baseline.get("results", []) if result.get("ops_per_s")
+    }
+    regressions = []
+    for result in results:
+        baseline_rate = baseline_rates.get(result.name)
+        if not baseline_rate or not result.ops_per_s:
+            continue
+        change = result.ops_per_s / baseline_rate - 1
+        if change < -threshold:
+            regressions.append(
+                f"{result.name}: {result.ops_per_s:,.1f} ops/s vs baseline {baseline_rate:,.1f} ops/s ({change:+.1%})"
+            )
+    return regressions
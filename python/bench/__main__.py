@@ -0,0 +1,122 @@
+"""Run the benchmarks: `python -m <package>.bench [--filter PATTERN] [--quick] [-o results.json] [--baseline FILE]`.
+Exits with 1 if any benchmark regressed past `--threshold` against `--baseline`
+"""
+
+import argparse
+from fnmatch import fnmatchcase
+import json
+import sys
+
+from mlc.utils.io import eprint
+
+from . import (
+    BenchResult,
+    compare_to_baseline,
+    DEFAULT_MAX_ROUNDS,
+    DEFAULT_MIN_TIME_S,
+    DEFAULT_REGRESSION_THRESHOLD,
+    environment_metadata,
+    results_to_json,
+    run_benchmark,
+)
+from .suites import DEFAULT_DATA_SIZE, QUICK_DATA_SIZE, SUITES
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument(
+        "-f",
+        "--filter",
+        action="append",
+        default=[],
+        help="Only run benchmarks whose name matches this glob (e.g., 'compression.zstd.*'). Can be repeated",
+    )
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs and fewer rounds, for a smoke test")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks that would run, without running them")
+    parser.add_argument("-o", "--output", help="Write the results (and environment metadata) to this JSON file")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_REGRESSION_THRESHOLD,
+        help="Fraction a benchmark may get slower than the baseline before it counts as a regression",
+    )
+    parser.add_argument("--min-time", type=float, default=None, help="Minimum seconds to run each benchmark for")
+    parser.add_argument("--profile", metavar="DIR", help="Write a cProfile of one round of each benchmark to DIR")
+    parser.add_argument("--tracemalloc", action="store_true", help="Record the peak memory of one round")
+    return parser.parse_args()
+
+
+def _selected(name: str, patterns: list[str]) -> bool:
+    return not patterns or any(fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def _format_rate(value: float | None, unit: str) -> str:
+    if value is None:
+        return ""
+    for prefix in ("", "k", "M", "G"):
+        if value < 1000:
+            break
+        value /= 1000
+    return f"{value:,.1f} {prefix}{unit}"
+
+
+def _print_table(results: list[BenchResult]) -> None:
+    width = max((len(result.name) for result in results), default=0)
+    print(f"{'benchmark':<{width}}  {'ops/s':>14}  {'throughput':>14}  {'rounds':>6}  notes")
+    for result in results:
+        if result.skipped:
+            print(f"{result.name:<{width}}  {'':>14}  {'':>14}  {'':>6}  skipped: {result.skipped}")
+            continue
+        notes = []
+        if result.peak_memory_bytes is not None:
+            notes.append(f"peak {_format_rate(result.peak_memory_bytes, 'B')}")
+        if result.profile_filename:
+            notes.append(result.profile_filename)
+        print(
+            f"{result.name:<{width}}  {_format_rate(result.ops_per_s, 'op/s'):>14}  "
+            f"{_format_rate(result.bytes_per_s, 'B/s'):>14}  {result.rounds:>6}  {', '.join(notes)}"
+        )
+
+
+def main() -> int:
+    args = _parse_args()
+    data_size = QUICK_DATA_SIZE if args.quick else DEFAULT_DATA_SIZE
+    min_time_s = args.min_time if args.min_time is not None else (0.02 if args.quick else DEFAULT_MIN_TIME_S)
+    max_rounds = 20 if args.quick else DEFAULT_MAX_ROUNDS
+
+    results = []
+    for suite in SUITES.values():
+        for bench in suite(data_size):
+            if not _selected(bench.name, args.filter):
+                continue
+            if args.list:
+                print(bench.name)
+                continue
+            if isinstance(bench, BenchResult):
+                results.append(bench)
+                continue
+            try:
+                results.append(run_benchmark(bench, min_time_s, max_rounds, args.profile, args.tracemalloc))
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                results.append(BenchResult(name=bench.name, skipped=f"{type(exc).__name__}: {exc}"))
+    if args.list:
+        return 0
+
+    _print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as handle:
+            json.dump(results_to_json(results, environment_metadata()), handle, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="UTF-8") as handle:
+            regressions = compare_to_baseline(results, json.load(handle), args.threshold)
+        if regressions:
+            eprint(f"{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}:")
+            for regression in regressions:
+                eprint(f"  {regression}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
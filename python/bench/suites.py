@@ -0,0 +1,312 @@
+"""Benchmarks for the modules in this package. Each suite yields a `Benchmark` per case, or a skipped `BenchResult` when
+the case can't run here (missing optional dependency, not implemented yet, ...). Modules are imported inside the suites
+so one suite's missing dependency doesn't stop the others
+"""
+
+import logging
+import logging.handlers
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Iterator
+import zlib
+
+from . import Benchmark, BenchResult
+
+
+# Bytes of input per round for the data-processing benchmarks. `quick` runs use `QUICK_DATA_SIZE`
+DEFAULT_DATA_SIZE = 1024 * 1024
+QUICK_DATA_SIZE = 64 * 1024
+# Records per round for the logging benchmarks
+LOG_RECORDS_PER_ROUND = 2000
+DB_LOG_RECORDS_PER_ROUND = 200
+
+# Modules whose import time is benchmarked, since short-lived CLI jobs pay it on every start
+IMPORT_TIME_MODULES = [
+    "mlc.compression",
+    "mlc.hashing.hashing",
+    "mlc.utils.io",
+    "mlc.utils.loading",
+    "mlc.utils.logger",
+]
+# A line of `python -X importtime` output: "import time: <self us> | <cumulative us> | <indented module name>"
+_IMPORT_TIME_LINE_RE = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|\s*(\S+)\s*$")
+
+SuiteFunc = Callable[[int], Iterator[Benchmark | BenchResult]]
+
+
+def _sample_data(size: int) -> bytes:
+    """Deterministic, log-like (so realistically compressible) data"""
+    rng = random.Random(0)
+    words = [b"request", b"handled", b"user", b"error", b"timeout", b"ok", b"GET", b"POST", b"/api/v1/items", b"200"]
+    chunks = []
+    total = 0
+    while total < size:
+        line = b" ".join(rng.choice(words) for _ in range(8)) + b" %d\n" % rng.randrange(1 << 32)
+        chunks.append(line)
+        total += len(line)
+    return b"".join(chunks)[:size]
+
+
+def _skip(name: str, exc: BaseException) -> BenchResult:
+    return BenchResult(name=name, skipped=f"{type(exc).__name__}: {exc}")
+
+
+def compression_suite(data_size: int) -> Iterator[Benchmark | BenchResult]:
+    """`compression.compress`/`decompress` per codec, at a low, middle, and max level where the codec has levels"""
+    try:
+        from mlc.compression import compress, decompress, TYPE_TO_FUNCS
+    except ImportError as exc:
+        yield _skip("compression", exc)
+        return
+
+    data = _sample_data(data_size)
+    for comp_type in TYPE_TO_FUNCS:
+        try:
+            _, _, level_kwarg, max_level = TYPE_TO_FUNCS[comp_type]
+        except ImportError as exc:
+            yield _skip(f"compression.{comp_type.name.lower()}", exc)
+            continue
+        # Low bits only for LZMA, whose max level also has the PRESET_EXTREME flag set
+        levels = [None] if not level_kwarg else sorted({1, (max_level & 0xFF) // 2, max_level})
+        for level in levels:
+            kwargs = {level_kwarg: level} if level is not None else {}
+            name = f"compression.{comp_type.name.lower()}" + (f".level{level}" if level is not None else "")
+            try:
+                compressed = compress(data, comp_type, dict(kwargs))
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                yield _skip(f"{name}.compress", exc)
+                continue
+            yield Benchmark(
+                f"{name}.compress",
+                lambda comp_type=comp_type, kwargs=kwargs: compress(data, comp_type, dict(kwargs)),
+                bytes_per_round=len(data),
+            )
+            yield Benchmark(
+                f"{name}.decompress",
+                lambda comp_type=comp_type, compressed=compressed: decompress(compressed, comp_type),
+                bytes_per_round=len(data),
+            )
+
+
+def hashing_suite(data_size: int) -> Iterator[Benchmark | BenchResult]:
+    """`hash_data` per `HashType`"""
+    try:
+        from mlc.hashing.hashing import hash_data, HashType
+    except ImportError as exc:
+        yield _skip("hashing", exc)
+        return
+
+    data = _sample_data(data_size)
+    for hash_type in HashType:
+        name = f"hashing.{hash_type.name.lower()}"
+        try:
+            hash_data(data, hash_type)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            yield _skip(name, exc)
+            continue
+        yield Benchmark(name, lambda hash_type=hash_type: hash_data(data, hash_type), bytes_per_round=len(data))
+
+
+def checksum_suite(data_size: int) -> Iterator[Benchmark | BenchResult]:
+    """The checksum/CRC kernels in `zlib` and `binascii`, plus `calc_checksum`/`calc_crc` per type once they're
+    implemented
+    """
+    import binascii
+
+    data = _sample_data(data_size)
+    yield Benchmark("checksum.zlib.crc32", lambda: zlib.crc32(data), bytes_per_round=len(data))
+    yield Benchmark("checksum.zlib.adler32", lambda: zlib.adler32(data), bytes_per_round=len(data))
+    yield Benchmark("checksum.binascii.crc_hqx", lambda: binascii.crc_hqx(data, 0), bytes_per_round=len(data))
+
+    try:
+        from mlc.hashing.checksum import calc_checksum, ChecksumType
+        from mlc.hashing.crc import calc_crc, CrcSettings, CrcType
+    except ImportError as exc:
+        yield _skip("checksum", exc)
+        return
+    for checksum_type in ChecksumType:
+        name = f"checksum.{checksum_type.name.lower()}"
+        try:
+            calc_checksum(data, checksum_type)
+        except NotImplementedError as exc:
+            yield _skip(name, exc)
+            continue
+        yield Benchmark(
+            name, lambda checksum_type=checksum_type: calc_checksum(data, checksum_type), bytes_per_round=len(data)
+        )
+    for crc_type in CrcType:
+        name = f"crc.{crc_type.name.lower()}"
+        if calc_crc(data, crc_type, CrcSettings()) is None:
+            yield BenchResult(name=name, skipped="Not implemented")
+            continue
+        yield Benchmark(
+            name, lambda crc_type=crc_type: calc_crc(data, crc_type, CrcSettings()), bytes_per_round=len(data)
+        )
+
+
+def _logger_benchmark(name: str, **set_up_kwargs) -> Benchmark:
+    from mlc.utils.logger import set_up_logger, stop_queue_listener
+
+    logger_name = f"bench_{name.replace('.', '_')}"
+    logger = logging.getLogger(f"mlc.bench.{logger_name}")
+    logger.propagate = False
+    log_dir = None
+
+    def _setup():
+        nonlocal log_dir
+        log_dir = tempfile.mkdtemp(prefix="mlc_bench_logs_")
+        set_up_kwargs.setdefault("use_file", os.path.join(log_dir, f"{logger_name}.log"))
+        set_up_logger(
+            logger_name,
+            logger=logger,
+            compress_old_logs=False,
+            log_dir=log_dir,
+            archive_dir=os.path.join(log_dir, "archive"),
+            use_stdout=False,
+            use_syslog=False,
+            **set_up_kwargs,
+        )
+
+    def _round():
+        start = time.perf_counter()
+        for idx in range(LOG_RECORDS_PER_ROUND):
+            logger.info("Handled request %d for %s", idx, "user")
+        elapsed = time.perf_counter() - start
+        # With a queue, only the calling thread's time counts. Waiting for the listener to catch up between rounds
+        # keeps a full queue from turning this into a measure of the listener's throughput
+        for handler in logger.handlers:
+            if isinstance(handler, logging.handlers.QueueHandler):
+                handler.queue.join()
+        return elapsed
+
+    def _teardown():
+        stop_queue_listener(logger.name)
+        for handler in list(logger.handlers):
+            handler.close()
+            logger.removeHandler(handler)
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    return Benchmark(
+        f"logger.{name}", _round, ops_per_round=LOG_RECORDS_PER_ROUND, setup=_setup, teardown=_teardown
+    )
+
+
+def logger_suite(_data_size: int) -> Iterator[Benchmark | BenchResult]:
+    """Records/s through `set_up_logger` per handler configuration, and per formatter. For the async configurations
+    this is the rate on the calling thread, i.e., the enqueue cost (while the listener thread competes for the GIL)
+    """
+    try:
+        from mlc.utils.logger import (
+            DEFAULT_LOG_FORMAT_STR,
+            JsonLinesFormatter,
+            LOG_RECORD_DATETIME_FORMAT,
+            RotatingLogFileSettings,
+        )
+        from mlc.utils.logger.formatters import BinaryRecordFormatter
+    except ImportError as exc:
+        yield _skip("logger", exc)
+        return
+
+    record = logging.LogRecord("bench", logging.INFO, __file__, 1, "Handled request %d for %s", (42, "user"), None)
+    formatters = {
+        "text": logging.Formatter(DEFAULT_LOG_FORMAT_STR, LOG_RECORD_DATETIME_FORMAT).format,
+        "json": JsonLinesFormatter().format,
+        "binary": BinaryRecordFormatter().format_bytes,
+    }
+    for name, format_func in formatters.items():
+
+        def _round(format_func=format_func):
+            for _ in range(LOG_RECORDS_PER_ROUND):
+                format_func(record)
+
+        yield Benchmark(f"logger.format.{name}", _round, ops_per_round=LOG_RECORDS_PER_ROUND)
+
+    configurations = {
+        "null": {"use_file": False, "additional_handlers": logging.NullHandler()},
+        "file": {},
+        "file.async": {"async_handlers": True, "block_on_full_queue": True},
+        "file.rotating": {"rotating_file": RotatingLogFileSettings(max_bytes=None, compression=None)},
+        "file.rotating.async": {
+            "rotating_file": RotatingLogFileSettings(max_bytes=None, compression=None),
+            "async_handlers": True,
+            "block_on_full_queue": True,
+        },
+        "file.json": {"structured_format": "json"},
+        "file.binary": {"structured_format": "binary"},
+    }
+    for name, set_up_kwargs in configurations.items():
+        yield _logger_benchmark(name, **set_up_kwargs)
+
+
+def db_log_handler_suite(_data_size: int) -> Iterator[Benchmark | BenchResult]:
+    """`DatabaseLogHandler` insert rate on SQLite. Each round starts a handler, logs to it, and closes it, which waits
+    for every record to be inserted
+    """
+    name = "db_log_handler.sqlite"
+    try:
+        from mlc.db.manager import DbManager
+        from mlc.utils.log_db_handler import DatabaseLogHandler
+    except ImportError as exc:
+        yield _skip(name, exc)
+        return
+
+    record = logging.LogRecord("bench", logging.INFO, __file__, 1, "Handled request %d", (42,), None)
+    db_dir = None
+    db_manager = None
+
+    def _setup():
+        nonlocal db_dir, db_manager
+        db_dir = tempfile.mkdtemp(prefix="mlc_bench_db_")
+        db_manager = DbManager(f"sqlite:///{os.path.join(db_dir, 'logs.db')}")
+
+    def _round():
+        handler = DatabaseLogHandler(db_manager)
+        for _ in range(DB_LOG_RECORDS_PER_ROUND):
+            handler.emit(record)
+        handler.close()
+
+    def _teardown():
+        if db_manager:
+            db_manager.engine.dispose()
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+    yield Benchmark(name, _round, ops_per_round=DB_LOG_RECORDS_PER_ROUND, setup=_setup, teardown=_teardown)
+
+
+def _import_time_s(module: str) -> float:
+    """Cumulative import time of `module` in a fresh interpreter, per `-X importtime`"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, env=env, text=True
+    )
+    if result.returncode:
+        raise RuntimeError(f"Importing {module} failed: {result.stderr.strip().splitlines()[-1]}")
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE_RE.match(line)
+        if match and match[3] == module:
+            return int(match[2]) / 1e6
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def import_time_suite(_data_size: int) -> Iterator[Benchmark | BenchResult]:
+    """Imports/s of each of `IMPORT_TIME_MODULES` in a fresh interpreter, from `-X importtime`'s cumulative time (so
+    interpreter startup isn't counted). A regression here means a module started importing something heavy eagerly
+    """
+    for module in IMPORT_TIME_MODULES:
+        yield Benchmark(f"import.{module}", lambda module=module: _import_time_s(module))
+
+
+SUITES: dict[str, SuiteFunc] = {
+    "compression": compression_suite,
+    "hashing": hashing_suite,
+    "checksum": checksum_suite,
+    "logger": logger_suite,
+    "db_log_handler": db_log_handler_suite,
+    "import_time": import_time_suite,
+}
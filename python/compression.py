@@ -1,25 +1,24 @@
 #!/usr/bin/env python3
 """Data compression and decompression utilities"""
 
-import bz2
+from collections.abc import Mapping
 from enum import auto
-import gzip
-import lzma
+import importlib
 import os
-import tarfile
-import tempfile
-from typing import Callable
+from types import ModuleType
+from typing import Callable, Iterator
 import zlib
 
 from mlc.utils.better_enum import BetterEnum
 
-import zstd
-
 
 def _to_tar_data(data: bytes, open_flags: str = "w") -> bytes:
     """tars up `data` and returns the tar contents.
     Supports both uncompressed and compressed based on `open_flags`
     """
+    import tarfile
+    import tempfile
+
     with (
         tempfile.NamedTemporaryFile() as raw_content_file,
         tempfile.NamedTemporaryFile() as file_tarred,
@@ -38,6 +37,9 @@ def _from_tar_data(data: bytes, open_flags: str = "r") -> bytes:
     """Interprets `data` as tar file contents and tries to untar them. Supports
     uncompressed and compressed formats of tar files (based on `open_flags`).
     """
+    import tarfile
+    import tempfile
+
     untarred_data = b""
     # This function is only a bit convoluted due to `tarfile` API pretty much
     # just doing this on files
@@ -141,27 +143,104 @@ def zstd_compress(data: bytes, level: int = 22) -> bytes:
     """ZSTD_compress doesn't have any keyword arguments, so the method used below causes an error because we pass level
     as a kwarg.
     """
+    import zstd
+
     return zstd.ZSTD_compress(data, level)
 
 
+def _import_backend(module_name: str, comp_type: CompressionType) -> ModuleType:
+    """Import the module `comp_type` needs, with an error saying which compression type is unavailable if it's
+    missing
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as exc:
+        raise ImportError(
+            f"CompressionType.{comp_type.name} is unavailable: module '{module_name}' couldn't be imported ({exc})"
+        ) from exc
+
+
+def _simple_loader(module_name: str, comp_type: CompressionType, level_kwarg: str, max_level: int) -> Callable:
+    def _load() -> tuple:
+        module = _import_backend(module_name, comp_type)
+        return module.compress, module.decompress, level_kwarg, max_level
+
+    return _load
+
+
+def _load_zstd() -> tuple:
+    zstd = _import_backend("zstd", CompressionType.ZSTD)
+    return zstd_compress, zstd.ZSTD_uncompress, "level", 22
+
+
+def _load_lzma() -> tuple:
+    lzma = _import_backend("lzma", CompressionType.LZMA)
+    return lzma.compress, lzma.decompress, "preset", 9 | lzma.PRESET_EXTREME
+
+
+def _load_tar(comp_type: CompressionType, to_tar: Callable, from_tar: Callable, module_name: str | None) -> tuple:
+    _import_backend("tarfile", comp_type)
+    if module_name:
+        _import_backend(module_name, comp_type)
+    return to_tar, from_tar, None, None
+
+
+class _LazyBackends(Mapping):
+    """`CompressionType` to its backend's (compress function, decompress function, compression level kwarg name, max
+    compression level value). Each backend is imported on first lookup of its type, so importing this module (and
+    using one codec) doesn't pay for every codec. Looking up a type whose backend is missing raises `ImportError`.
+    """
+
+    def __init__(self, loaders: dict[CompressionType, Callable[[], tuple]]):
+        self._loaders = loaders
+        self._loaded: dict[CompressionType, tuple] = {}
+
+    def __getitem__(self, comp_type: CompressionType) -> tuple[Callable, Callable, str, int]:
+        try:
+            return self._loaded[comp_type]
+        except KeyError:
+            pass
+        # Unknown types raise KeyError here, like a dict would
+        funcs = self._loaders[comp_type]()
+        self._loaded[comp_type] = funcs
+        return funcs
+
+    def __contains__(self, comp_type: object) -> bool:
+        # Without loading the backend
+        return comp_type in self._loaders
+
+    def __iter__(self) -> Iterator[CompressionType]:
+        return iter(self._loaders)
+
+    def __len__(self) -> int:
+        return len(self._loaders)
+
+
 # Compress function, decompress function, compression level kwarg name, max
-# compression level value
-TYPE_TO_FUNCS: dict[CompressionType, tuple[Callable, Callable, str, int]] = {
-    CompressionType.GZIP: (gzip.compress, gzip.decompress, "compresslevel", 9),
-    CompressionType.ZSTD: (zstd_compress, zstd.ZSTD_uncompress, "level", 22),
-    CompressionType.LZMA: (
-        lzma.compress,
-        lzma.decompress,
-        "preset",
-        9 | lzma.PRESET_EXTREME,
-    ),
-    CompressionType.BZ2: (bz2.compress, bz2.decompress, "compresslevel", 9),
-    CompressionType.ZLIB: (zlib.compress, zlib.decompress, "level", 9),
-    CompressionType.TAR: (_to_tar, _from_tar, None, None),
-    CompressionType.TAR_GZ: (_to_tar_gz, _from_tar_gz, None, None),
-    CompressionType.TAR_BZ2: (_to_tar_bz2, _from_tar_bz2, None, None),
-    CompressionType.TAR_XZ: (_to_tar_xz, _from_tar_xz, None, None),
-}
+# compression level value. Only iterate the keys (or check availability one type at a time): `items()`/`values()`
+# load every backend
+TYPE_TO_FUNCS: Mapping[CompressionType, tuple[Callable, Callable, str, int]] = _LazyBackends(
+    {
+        CompressionType.GZIP: _simple_loader("gzip", CompressionType.GZIP, "compresslevel", 9),
+        CompressionType.ZSTD: _load_zstd,
+        CompressionType.LZMA: _load_lzma,
+        CompressionType.BZ2: _simple_loader("bz2", CompressionType.BZ2, "compresslevel", 9),
+        CompressionType.ZLIB: lambda: (zlib.compress, zlib.decompress, "level", 9),
+        CompressionType.TAR: lambda: _load_tar(CompressionType.TAR, _to_tar, _from_tar, None),
+        CompressionType.TAR_GZ: lambda: _load_tar(CompressionType.TAR_GZ, _to_tar_gz, _from_tar_gz, "gzip"),
+        CompressionType.TAR_BZ2: lambda: _load_tar(CompressionType.TAR_BZ2, _to_tar_bz2, _from_tar_bz2, "bz2"),
+        CompressionType.TAR_XZ: lambda: _load_tar(CompressionType.TAR_XZ, _to_tar_xz, _from_tar_xz, "lzma"),
+    }
+)
+
+
+def is_available(comp_type: CompressionType) -> bool:
+    """Whether `comp_type`'s backend can be imported (e.g., ZSTD needs the optional `zstd` package)"""
+    try:
+        TYPE_TO_FUNCS[comp_type]
+    except ImportError:
+        return False
+    return True
 
 
 def compress(data: bytes, comp_type: CompressionType, kwargs: dict | None = None) -> bytes:
@@ -2,10 +2,9 @@
 
 from enum import auto
 import hashlib
+import importlib
 from typing import Callable, Dict
 
-from Crypto.Hash import MD2, MD4
-
 from mlc.utils.better_enum import BetterEnum
 
 
@@ -44,14 +43,22 @@ class HashType(BetterEnum):
 # Will probably need other libraries or to implement them ourself
 
 
+def _import_crypto_hash(name: str):
+    """MD2 and MD4 come from the optional pycryptodome package, which is only imported when they're used"""
+    try:
+        return importlib.import_module(f"Crypto.Hash.{name}")
+    except ImportError as exc:
+        raise ImportError(f"HashType.{name} needs the pycryptodome package ({exc})") from exc
+
+
 def md2(data: bytes) -> bytes:
-    hasher = MD2.new()
+    hasher = _import_crypto_hash("MD2").new()
     hasher.update(data)
     return hasher.digest()
 
 
 def md4(data: bytes) -> bytes:
-    hasher = MD4.new()
+    hasher = _import_crypto_hash("MD4").new()
     hasher.update(data)
     return hasher.digest()
 
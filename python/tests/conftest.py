@@ -0,0 +1,16 @@
+"""Makes the package importable as `mlc` when running the tests from a checkout"""
+
+import atexit
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+
+if importlib.util.find_spec("mlc") is None:
+    _PATH_DIR = tempfile.mkdtemp(prefix="mlc-tests-")
+    os.symlink(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), os.path.join(_PATH_DIR, "mlc"))
+    sys.path.insert(0, _PATH_DIR)
+    # Also for worker processes that aren't forked (the spawn and forkserver start methods)
+    os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, (_PATH_DIR, os.environ.get("PYTHONPATH"))))
+    atexit.register(shutil.rmtree, _PATH_DIR, ignore_errors=True)
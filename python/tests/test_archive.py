@@ -0,0 +1,124 @@
+import gzip
+import json
+import os
+import tarfile
+
+import pytest
+
+from mlc.utils.logger import archive
+from mlc.utils.logger.archive import compress_logs, LOG_ARCHIVE_INDEX_FILENAME_TEMPLATE
+from mlc.utils.logger.handlers import PENDING_SEGMENT_SUFFIX
+from mlc.utils.logger.search import LOG_ARCHIVE_INDEX_SUFFIX
+
+
+def _make_logs(log_dir, count: int) -> list[str]:
+    os.makedirs(log_dir, exist_ok=True)
+    filenames = []
+    for idx in range(count):
+        filename = os.path.join(log_dir, f"app_{idx:02d}.log")
+        with open(filename, "w", encoding="UTF-8") as handle:
+            handle.write(json.dumps({"ts": 100.0 + idx, "level": "INFO", "name": "app", "msg": f"record {idx}"}) + "\n")
+        filenames.append(filename)
+    return filenames
+
+
+def _read_index(archive_dir) -> list[dict]:
+    index_filename = os.path.join(archive_dir, LOG_ARCHIVE_INDEX_FILENAME_TEMPLATE.format(logger_name="app"))
+    with open(index_filename, "r", encoding="UTF-8") as handle:
+        return [json.loads(line) for line in handle]
+
+
+def _member_names(archive_filename: str) -> list[str]:
+    with tarfile.open(archive_filename) as tar_file:
+        return [os.path.basename(name) for name in tar_file.getnames()]
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_compress_logs_chunks(tmp_path, monkeypatch, max_workers):
+    log_dir = tmp_path / "logs"
+    archive_dir = tmp_path / "archive"
+    _make_logs(log_dir, 5)
+    pools = []
+    process_pool = archive._process_pool
+
+    def _spy(workers):
+        pools.append(workers)
+        return process_pool(workers)
+
+    monkeypatch.setattr(archive, "_process_pool", _spy)
+    archived = compress_logs("app", str(log_dir), str(archive_dir), log_archive_chunk_size=2, max_workers=max_workers)
+    # Serial unless asked for workers
+    assert pools == ([max_workers] if max_workers else [])
+
+    # The last chunk gets what's left over, and files stay in name (so time) order
+    assert [_member_names(filename) for filename in archived] == [
+        ["app_00.log", "app_01.log"],
+        ["app_02.log", "app_03.log"],
+        ["app_04.log"],
+    ]
+    assert all(filename.endswith(".tar.gz") for filename in archived)
+    assert os.listdir(log_dir) == []
+    index = _read_index(archive_dir)
+    assert [entry["archive"] for entry in index] == [os.path.basename(filename) for filename in archived]
+    assert [[os.path.basename(member) for member in entry["members"]] for entry in index] == [
+        ["app_00.log", "app_01.log"],
+        ["app_02.log", "app_03.log"],
+        ["app_04.log"],
+    ]
+    assert all(os.path.exists(filename + LOG_ARCHIVE_INDEX_SUFFIX) for filename in archived)
+
+
+def test_compress_logs_takes_compressed_segments_only(tmp_path):
+    log_dir = tmp_path / "logs"
+    archive_dir = tmp_path / "archive"
+    _make_logs(log_dir, 1)
+    with gzip.open(log_dir / "app_01_123.log.gz", "wb") as handle:
+        handle.write(b"compressed segment\n")
+    (log_dir / f"app_02_456.log{PENDING_SEGMENT_SUFFIX}").write_text("still being compressed\n", encoding="UTF-8")
+    (log_dir / "notes.txt").write_text("not a log\n", encoding="UTF-8")
+
+    (archived,) = compress_logs("app", str(log_dir), str(archive_dir), codec="TAR", build_index=False)
+    assert archived.endswith(".tar")
+    assert _member_names(archived) == ["app_00.log", "app_01_123.log.gz"]
+    assert sorted(os.listdir(log_dir)) == [f"app_02_456.log{PENDING_SEGMENT_SUFFIX}", "notes.txt"]
+    assert not os.path.exists(archived + LOG_ARCHIVE_INDEX_SUFFIX)
+
+
+def test_compress_logs_keeps_logs_of_failed_chunks(tmp_path, monkeypatch):
+    log_dir = tmp_path / "logs"
+    archive_dir = tmp_path / "archive"
+    filenames = _make_logs(log_dir, 3)
+    write_tar = archive._write_tar
+
+    def _failing_write_tar(tar_filename, member_dir, chunk, codec, level):
+        if chunk[0] == filenames[0]:
+            with open(tar_filename, "wb") as handle:
+                handle.write(b"partial")
+            raise OSError("disk full")
+        return write_tar(tar_filename, member_dir, chunk, codec, level)
+
+    monkeypatch.setattr(archive, "_write_tar", _failing_write_tar)
+    with pytest.raises(OSError, match="disk full"):
+        compress_logs("app", str(log_dir), str(archive_dir), log_archive_chunk_size=2)
+
+    # The failed chunk's logs are still there and nothing of its archive is left. The other chunk is still indexed
+    assert sorted(os.listdir(log_dir)) == ["app_00.log", "app_01.log"]
+    index = _read_index(archive_dir)
+    assert [[os.path.basename(member) for member in entry["members"]] for entry in index] == [["app_02.log"]]
+    assert sorted(os.listdir(archive_dir)) == sorted(
+        [
+            LOG_ARCHIVE_INDEX_FILENAME_TEMPLATE.format(logger_name="app"),
+            index[0]["archive"],
+            index[0]["archive"] + LOG_ARCHIVE_INDEX_SUFFIX,
+        ]
+    )
+
+
+def test_compress_logs_rejects_bad_arguments(tmp_path):
+    _make_logs(tmp_path / "logs", 1)
+    with pytest.raises(ValueError):
+        compress_logs("app", str(tmp_path / "logs"), str(tmp_path / "archive"), log_archive_chunk_size=0)
+    with pytest.raises(ValueError):
+        compress_logs("app", str(tmp_path / "logs"), str(tmp_path / "archive"), codec="NOPE")
+    assert os.listdir(tmp_path / "logs") == ["app_00.log"]
+    assert compress_logs("app", str(tmp_path / "missing"), str(tmp_path / "archive")) == []
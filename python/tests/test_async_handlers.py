@@ -0,0 +1,123 @@
+import logging
+import queue
+import threading
+
+import pytest
+
+from mlc.utils.logger import set_up_logger, stop_queue_listener
+from mlc.utils.logger.handlers import BoundedQueueHandler
+
+
+class _CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.messages = []
+        self.flushed = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+        self.messages.append(self.format(record))
+
+    def flush(self) -> None:
+        self.flushed += 1
+
+
+@pytest.fixture(name="logger")
+def _logger():
+    logger = logging.getLogger("test_async_handlers")
+    logger.propagate = False
+    yield logger
+    stop_queue_listener(logger.name)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def _set_up(logger: logging.Logger, sink: logging.Handler) -> None:
+    set_up_logger(
+        logger.name,
+        logger=logger,
+        compress_old_logs=False,
+        use_stdout=False,
+        use_file=False,
+        use_syslog=False,
+        log_format="%(message)s",
+        additional_handlers=sink,
+        async_handlers=True,
+    )
+
+
+def _record(msg: str, *args) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, None)
+
+
+def test_full_queue_drops_and_counts():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+    for idx in range(5):
+        handler.handle(_record("record %d", idx))
+    assert handler.dropped == 3
+    assert [handler.queue.get_nowait().msg for _ in range(2)] == ["record 0", "record 1"]
+
+
+def test_full_queue_blocks():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1), block_on_full=True)
+    handler.handle(_record("first"))
+    thread = threading.Thread(target=handler.handle, args=(_record("second"),))
+    thread.start()
+    thread.join(0.1)
+    assert thread.is_alive()
+    assert handler.queue.get().msg == "first"
+    thread.join(5)
+    assert not thread.is_alive()
+    assert handler.queue.get_nowait().msg == "second"
+    assert handler.dropped == 0
+
+
+def test_stop_queue_listener_flushes(logger):
+    sink = _CollectingHandler()
+    _set_up(logger, sink)
+    for idx in range(100):
+        logger.info("record %d", idx)
+    stop_queue_listener(logger.name)
+    assert sink.messages == [f"record {idx}" for idx in range(100)]
+    assert sink.flushed
+
+
+def test_second_set_up_replaces_queue_handler(logger):
+    old_sink = _CollectingHandler()
+    new_sink = _CollectingHandler()
+    _set_up(logger, old_sink)
+    logger.info("before")
+    _set_up(logger, new_sink)
+    logger.info("after")
+    stop_queue_listener(logger.name)
+
+    assert len([handler for handler in logger.handlers if isinstance(handler, BoundedQueueHandler)]) == 1
+    # The old listener was stopped, flushing what it had, before the new one started
+    assert old_sink.messages == ["before"]
+    assert new_sink.messages == ["after"]
+
+
+def test_queue_handler_leaves_caller_record_alone(logger):
+    sink = _CollectingHandler()
+    _set_up(logger, sink)
+    # Runs after the queue handler, on the calling thread
+    other = _CollectingHandler()
+    logger.addHandler(other)
+    args = ["mutable"]
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("args %s", args)
+    args.append("changed")
+    stop_queue_listener(logger.name)
+
+    assert sink.messages[0].startswith("args ['mutable']\nTraceback")
+    assert "ValueError: boom" in sink.messages[0]
+    # A handler outside the queue still gets the record as logged
+    (record,) = other.records
+    assert record.msg == "args %s"
+    assert record.args == (args,)
+    assert record.exc_info[0] is ValueError
+    assert sink.records[0] is not record
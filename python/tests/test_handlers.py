@@ -0,0 +1,109 @@
+import gzip
+import logging
+import os
+import time
+
+import pytest
+
+from mlc.utils.logger.handlers import BufferedRotatingFileHandler, PENDING_SEGMENT_SUFFIX, RotatingLogFileSettings
+
+
+def _record(msg: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord("test", level, __file__, 1, msg, None, None)
+
+
+def _handler(tmp_path, **settings) -> BufferedRotatingFileHandler:
+    settings = {"rotate_interval_s": None, "fsync_interval_s": None, "compression": None, **settings}
+    handler = BufferedRotatingFileHandler(str(tmp_path / "app.log"), RotatingLogFileSettings(**settings))
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def _segments(tmp_path) -> list[str]:
+    return sorted(name for name in os.listdir(tmp_path) if name != "app.log")
+
+
+def test_rotates_on_size(tmp_path):
+    handler = _handler(tmp_path, max_bytes=100)
+    messages = [f"record {idx:03d}" for idx in range(30)]
+    for msg in messages:
+        handler.handle(_record(msg))
+    handler.close()
+
+    segments = _segments(tmp_path)
+    assert len(segments) == 3
+    assert all(name.startswith("app_") and name.endswith(".log") for name in segments)
+    contents = ""
+    for name in [*segments, "app.log"]:
+        with open(tmp_path / name, "r", encoding="UTF-8") as handle:
+            content = handle.read()
+        # Rotation happens right after the record that crosses the threshold
+        assert len(content) < 100 + len("record 000\n")
+        contents += content
+    assert contents == "".join(msg + "\n" for msg in messages)
+
+
+def test_flushes_warnings_immediately(tmp_path):
+    handler = _handler(tmp_path)
+    handler.handle(_record("info"))
+    assert (tmp_path / "app.log").read_text(encoding="UTF-8") == ""
+    handler.handle(_record("warning", logging.WARNING))
+    assert (tmp_path / "app.log").read_text(encoding="UTF-8") == "info\nwarning\n"
+    handler.close()
+
+
+def test_syncs_periodically(tmp_path):
+    handler = _handler(tmp_path, fsync_interval_s=0.05)
+    handler.handle(_record("info"))
+    deadline = time.monotonic() + 5
+    while not (tmp_path / "app.log").read_text(encoding="UTF-8") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert (tmp_path / "app.log").read_text(encoding="UTF-8") == "info\n"
+    handler.close()
+
+
+def test_compresses_rotated_segments(tmp_path):
+    pytest.importorskip("mlc.compression")
+    handler = _handler(tmp_path, compression="GZIP")
+    handler.handle(_record("first segment"))
+    handler.rotate()
+    handler.handle(_record("second segment"))
+    # Waits for the compressor
+    handler.close()
+
+    (segment,) = _segments(tmp_path)
+    assert segment.endswith(".log.gz")
+    with gzip.open(tmp_path / segment, "rb") as handle:
+        assert handle.read() == b"first segment\n"
+    assert (tmp_path / "app.log").read_text(encoding="UTF-8") == "second segment\n"
+
+
+def test_keeps_segment_uncompressed_when_compression_fails(tmp_path, monkeypatch):
+    compression = pytest.importorskip("mlc.compression")
+
+    def _fail(*_args, **_kwargs):
+        raise ValueError("corrupt")
+
+    monkeypatch.setattr(compression, "compress", _fail)
+    handler = _handler(tmp_path, compression="GZIP")
+    handler.handle(_record("first segment"))
+    handler.rotate()
+    handler.close()
+
+    # Archived as a plain log instead, and nothing half-written is left behind
+    (segment,) = _segments(tmp_path)
+    assert segment.endswith(".log")
+    assert (tmp_path / segment).read_text(encoding="UTF-8") == "first segment\n"
+
+
+def test_resubmits_pending_segments(tmp_path):
+    pytest.importorskip("mlc.compression")
+    # Rotated by an earlier run that exited before compressing it. Another log's segment is left alone
+    (tmp_path / f"app_123.log{PENDING_SEGMENT_SUFFIX}").write_text("left over\n", encoding="UTF-8")
+    (tmp_path / f"other_123.log{PENDING_SEGMENT_SUFFIX}").write_text("not ours\n", encoding="UTF-8")
+    handler = _handler(tmp_path, compression="GZIP")
+    handler.close()
+
+    assert _segments(tmp_path) == ["app_123.log.gz", f"other_123.log{PENDING_SEGMENT_SUFFIX}"]
+    with gzip.open(tmp_path / "app_123.log.gz", "rb") as handle:
+        assert handle.read() == b"left over\n"
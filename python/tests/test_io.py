@@ -0,0 +1,127 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mlc.utils import io as mlc_io
+from mlc.utils.io import BufferedFdWriter, eprint
+
+
+def _read_all(fd: int) -> bytes:
+    chunks = []
+    while chunk := os.read(fd, 65536):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+@pytest.mark.parametrize("use_writev", [True, False])
+def test_buffered_fd_writer_partial_writes(monkeypatch, use_writev):
+    if use_writev and not hasattr(os, "writev"):
+        pytest.skip("os.writev isn't available")
+    real_write = os.write
+    calls = []
+
+    # Write at most 5 bytes per call, splitting buffers at arbitrary points
+    def _short_writev(fd, buffers):
+        calls.append(len(buffers))
+        return real_write(fd, b"".join(buffers)[:5])
+
+    def _short_write(fd, data):
+        calls.append(1)
+        return real_write(fd, bytes(data[:5]))
+
+    monkeypatch.setattr(os, "writev", _short_writev, raising=False)
+    monkeypatch.setattr(os, "write", _short_write)
+    monkeypatch.setattr(mlc_io, "_MAX_WRITEV_BUFFERS", 3)
+    read_fd, write_fd = os.pipe()
+    try:
+        writer = BufferedFdWriter(write_fd, buffer_size=1 << 20, use_writev=use_writev)
+        parts = [b"abc", b"", b"defghijk", b"l", "mnö", b"pqrstuvwxyz" * 3]
+        for part in parts:
+            writer.write(part)
+        writer.close()
+        os.close(write_fd)
+        write_fd = None
+        expected = b"".join(part.encode() if isinstance(part, str) else part for part in parts)
+        assert _read_all(read_fd) == expected
+        # Never more buffers per call than the system allows
+        assert calls and max(calls) <= 3
+    finally:
+        os.close(read_fd)
+        if write_fd is not None:
+            os.close(write_fd)
+
+
+def test_buffered_fd_writer_flushes_at_buffer_size():
+    read_fd, write_fd = os.pipe()
+    try:
+        writer = BufferedFdWriter(write_fd, buffer_size=8)
+        writer.write(b"1234")
+        os.set_blocking(read_fd, False)
+        with pytest.raises(BlockingIOError):
+            os.read(read_fd, 100)
+        writer.write(b"5678")
+        assert os.read(read_fd, 100) == b"12345678"
+        writer.write(b"9")
+        writer.discard()
+        writer.close()
+        with pytest.raises(BlockingIOError):
+            os.read(read_fd, 100)
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+
+def test_buffered_fd_writer_unbuffered_after_close():
+    read_fd, write_fd = os.pipe()
+    try:
+        writer = BufferedFdWriter(write_fd, flush_interval_s=10)
+        writer.write(b"early ")
+        writer.close()
+        writer.write(b"late")
+        assert os.read(read_fd, 100) == b"early late"
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+
+def test_eprint_from_late_atexit_function():
+    # atexit functions run in reverse order, so this one runs after the stderr writer (created by the first eprint)
+    # is closed
+    code = (
+        "import atexit\n"
+        "from mlc.utils.io import eprint\n"
+        "atexit.register(lambda: eprint('late'))\n"
+        "eprint('early')\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stderr == "early\nlate\n"
+
+
+def test_eprint_follows_redirected_stderr():
+    buffer = io.StringIO()
+    with contextlib.redirect_stderr(buffer):
+        eprint("a", 1, sep="-", end="!\n")
+    assert buffer.getvalue() == "a-1!\n"
+
+
+def test_eprint_to_file():
+    buffer = io.StringIO()
+    eprint("to", "file", file=buffer)
+    assert buffer.getvalue() == "to file\n"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Needs os.fork")
+def test_stderr_writer_in_forked_child_isnt_buffered(capfd):
+    pid = os.fork()
+    if pid == 0:
+        # `os._exit` skips the atexit flush, so the child must not buffer
+        try:
+            mlc_io.get_stderr_writer().write("from child\n")
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    assert "from child" in capfd.readouterr().err
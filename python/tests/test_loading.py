@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from mlc.utils.loading import iter_yaml_documents, JsonLinesFile, YamlDocumentsFile
+
+
+def _write(tmp_path, name: str, content: str) -> str:
+    filename = tmp_path / name
+    filename.write_text(content, encoding="UTF-8")
+    return str(filename)
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        ("a: 1\n", [{"a": 1}]),
+        ("a: 1\n---\nb: 2\n", [{"a": 1}, {"b": 2}]),
+        # Comments and directives before the first `---` aren't a document of their own
+        ("# comment\n%YAML 1.2\n\n---\na: 1\n--- \nb: 2\n", [{"a": 1}, {"b": 2}]),
+        ("---\na: 1\n---\t# trailing comment\nb: 2\n---\n", [{"a": 1}, {"b": 2}, None]),
+        # `---` only starts a document at the start of a line, followed by whitespace or the end of the line
+        ("a: '---'\nb: ---x\n  --- \n", [{"a": "---", "b": "---x ---"}]),
+        ("\n# only a comment\n", []),
+        ("", []),
+    ],
+)
+def test_yaml_documents_split(tmp_path, content, expected):
+    filename = _write(tmp_path, "docs.yaml", content)
+    assert list(iter_yaml_documents(filename)) == expected
+    with YamlDocumentsFile(filename) as documents:
+        assert len(documents) == len(expected)
+        assert [documents[idx] for idx in range(len(documents))] == expected
+
+
+def test_jsonl_indexing(tmp_path):
+    filename = _write(tmp_path, "records.jsonl", '{"a": 1}\n\n[2, 3]\n  \n"four"')
+    with JsonLinesFile(filename) as records:
+        assert len(records) == 3
+        assert records[0] == {"a": 1}
+        assert records[-1] == "four"
+        assert list(records.iter_range(1)) == [[2, 3], "four"]
+        with pytest.raises(IndexError):
+            records[3]
+
+
+def test_iter_range_parallel_matches_serial(tmp_path):
+    jsonl_filename = _write(tmp_path, "records.jsonl", "".join(json.dumps({"idx": idx}) + "\n" for idx in range(250)))
+    yaml_filename = _write(tmp_path, "docs.yaml", "# header\n" + "".join(f"---\nidx: {idx}\n" for idx in range(250)))
+    for cls, filename in ((JsonLinesFile, jsonl_filename), (YamlDocumentsFile, yaml_filename)):
+        with cls(filename) as records:
+            assert list(records.iter_range_parallel(max_workers=2, chunk_records=16)) == list(records)
+            assert list(records.iter_range_parallel(10, 100, max_workers=2, chunk_records=7)) == list(
+                records.iter_range(10, 100)
+            )
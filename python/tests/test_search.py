@@ -0,0 +1,106 @@
+import json
+import logging
+import os
+
+import pytest
+
+from mlc.utils.logger import search
+from mlc.utils.logger.archive import archive_log_chunk
+from mlc.utils.logger.search import BloomFilter, query_logs
+
+
+def _write_log(filename: str, records: list[tuple[float, str, str, str]]) -> str:
+    with open(filename, "w", encoding="UTF-8") as handle:
+        for timestamp, level, name, msg in records:
+            handle.write(json.dumps({"ts": timestamp, "level": level, "name": name, "msg": msg}) + "\n")
+    return filename
+
+
+def _archive(tmp_path, records_by_file: dict[str, list]) -> str:
+    log_dir = tmp_path / "logs"
+    archive_dir = tmp_path / "archive"
+    os.makedirs(log_dir, exist_ok=True)
+    os.makedirs(archive_dir, exist_ok=True)
+    filenames = [_write_log(str(log_dir / name), records) for name, records in records_by_file.items()]
+    archive_log_chunk(str(archive_dir / "app_log_archive_0_x.tar"), filenames, codec="TAR")
+    return str(archive_dir)
+
+
+def test_bloom_filter_round_trip():
+    items = {f"item{idx}" for idx in range(200)}
+    bloom = BloomFilter.for_items(items)
+    restored = BloomFilter.from_json(json.loads(json.dumps(bloom.to_json())))
+    assert restored.num_bits == bloom.num_bits
+    assert all(item in restored for item in items)
+    # 10 bits per item and 7 hashes is about a 1% false positive rate
+    false_positives = sum(f"other{idx}" in restored for idx in range(1000))
+    assert false_positives < 50
+
+
+def test_query_logs_filters_records(tmp_path):
+    archive_dir = _archive(
+        tmp_path,
+        {
+            "a.log": [(100.0, "INFO", "app", "started"), (101.0, "ERROR", "app.db", "Connection refused")],
+            "b.log": [(200.0, "DEBUG", "app", "tick"), (201.0, "WARNING", "app", "slow request")],
+        },
+    )
+    assert [record.message for record in query_logs(archive_dir)] == [
+        "started",
+        "Connection refused",
+        "tick",
+        "slow request",
+    ]
+    assert [record.message for record in query_logs(archive_dir, start=150)] == ["tick", "slow request"]
+    assert [record.message for record in query_logs(archive_dir, min_level="warning")] == [
+        "Connection refused",
+        "slow request",
+    ]
+    assert [record.message for record in query_logs(archive_dir, contains="REFUSED")] == ["Connection refused"]
+    # Words cut off at either end of the query still match
+    assert [record.message for record in query_logs(archive_dir, contains="ONNECTION REFU")] == ["Connection refused"]
+    records = list(query_logs(archive_dir, logger_name="app.db"))
+    assert [(record.member, record.levelno) for record in records] == [("app_log_archive_0_x/a.log", logging.ERROR)]
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "expected"),
+    [
+        ({"end": 150}, ["app_log_archive_0_x/a.log"]),
+        ({"min_level": logging.ERROR}, ["app_log_archive_0_x/b.log"]),
+        ({"logger_name": "app.db"}, ["app_log_archive_0_x/b.log"]),
+        ({"contains": "first"}, ["app_log_archive_0_x/a.log"]),
+        ({"contains": "absent text"}, []),
+    ],
+)
+def test_query_logs_prunes_members(tmp_path, monkeypatch, kwargs, expected):
+    archive_dir = _archive(
+        tmp_path,
+        {
+            "a.log": [(100.0, "INFO", "app", "first member")],
+            "b.log": [(200.0, "ERROR", "app.db", "second member")],
+        },
+    )
+    scanned = []
+    iter_archive_members = search._iter_archive_members
+
+    def _spy(archive_filename, entries):
+        scanned.append(sorted(entry["member"] for entry in entries))
+        return iter_archive_members(archive_filename, entries)
+
+    monkeypatch.setattr(search, "_iter_archive_members", _spy)
+    list(query_logs(archive_dir, **kwargs))
+    assert scanned == [expected]
+
+
+def test_query_logs_orders_archives_by_time(tmp_path):
+    log_dir = tmp_path / "logs"
+    archive_dir = tmp_path / "archive"
+    os.makedirs(log_dir)
+    os.makedirs(archive_dir)
+    # Chunk 10 sorts before chunk 2 by name, but holds later records
+    later = _write_log(str(log_dir / "later.log"), [(300.0, "INFO", "app", "later")])
+    earlier = _write_log(str(log_dir / "earlier.log"), [(100.0, "INFO", "app", "earlier")])
+    archive_log_chunk(str(archive_dir / "app_log_archive_10_x.tar"), [later], codec="TAR")
+    archive_log_chunk(str(archive_dir / "app_log_archive_2_x.tar"), [earlier], codec="TAR")
+    assert [record.message for record in query_logs(str(archive_dir))] == ["earlier", "later"]
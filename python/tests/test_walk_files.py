@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from mlc.utils.loading import get_all_filenames, walk_files
+
+
+def _touch(path, content: str = "") -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="UTF-8") as handle:
+        handle.write(content)
+
+
+def _rel_paths(root, entries) -> set[str]:
+    return {os.path.relpath(entry.path, root) for entry in entries}
+
+
+@pytest.fixture(name="tree")
+def _tree(tmp_path):
+    root = tmp_path / "root"
+    _touch(root / "a.py", "a")
+    _touch(root / "b.txt", "bb")
+    _touch(root / "sub" / "c.py", "ccc")
+    _touch(root / "sub" / "deeper" / "d.log")
+    _touch(root / "build" / "e.py")
+    _touch(tmp_path / "outside" / "f.py")
+    os.symlink(tmp_path / "outside", root / "dir_link")
+    os.symlink(root / "a.py", root / "file_link.py")
+    os.symlink(root / "missing", root / "dangling")
+    return root
+
+
+def test_matches_os_walk(tree):
+    expected = {
+        os.path.relpath(os.path.join(dirpath, name), tree)
+        for dirpath, _, filenames in os.walk(tree)
+        for name in filenames
+    }
+    assert _rel_paths(tree, walk_files(tree)) == expected
+    # Symlinks to directories are neither followed nor yielded
+    assert "dir_link" not in expected and "dir_link/f.py" not in expected
+    assert {"file_link.py", "dangling"} <= expected
+
+
+def test_stat_data(tree):
+    entries = {os.path.relpath(entry.path, tree): entry for entry in walk_files(tree)}
+    assert entries["sub/c.py"].size == 3
+    assert entries["sub/c.py"].mtime_ns == os.stat(tree / "sub" / "c.py").st_mtime_ns
+    # Symlinks are followed for the stat data, unless they dangle
+    assert entries["file_link.py"].size == 1
+    assert entries["dangling"].size == os.lstat(tree / "dangling").st_size
+
+
+def test_include_and_exclude(tree):
+    # include only applies to files, so directories are still searched
+    assert _rel_paths(tree, walk_files(tree, include=["*.py"])) == {"a.py", "sub/c.py", "build/e.py", "file_link.py"}
+    assert _rel_paths(tree, walk_files(tree, include=["sub/*"])) == {"sub/c.py", "sub/deeper/d.log"}
+    # Excluded directories aren't descended into, matched by name or by relative path
+    assert _rel_paths(tree, walk_files(tree, include=["*.py"], exclude=["build", "*link*"])) == {"a.py", "sub/c.py"}
+    assert _rel_paths(tree, walk_files(tree, exclude=["sub/deeper"])) == _rel_paths(tree, walk_files(tree)) - {
+        "sub/deeper/d.log"
+    }
+
+
+def test_gitignore(tree):
+    _touch(tree / ".git" / "HEAD")
+    _touch(tree / "keep.log")
+    _touch(tree / "sub" / "notes.txt")
+    _touch(tree / "sub" / "important.txt")
+    _touch(tree / ".gitignore", "# comment\n*.log\n!keep.log\nbuild/\n/b.txt\n*link*\ndangling\n")
+    # Nested: applies under sub/ only, and can re-include what a parent ignores
+    _touch(tree / "sub" / ".gitignore", "*.txt\n!important.txt\n!deeper/d.log\n")
+    assert _rel_paths(tree, walk_files(tree, use_gitignore=True)) == {
+        ".gitignore",
+        "a.py",
+        "keep.log",
+        "sub/.gitignore",
+        "sub/c.py",
+        "sub/important.txt",
+        "sub/deeper/d.log",
+    }
+    # Anchored patterns (`/b.txt`) only match at their .gitignore's level
+    _touch(tree / "sub" / ".gitignore")
+    _touch(tree / "sub" / "b.txt")
+    rel_paths = _rel_paths(tree, walk_files(tree, use_gitignore=True))
+    assert "b.txt" not in rel_paths
+    assert "sub/b.txt" in rel_paths
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"include": ["*.py"]}, {"exclude": ["sub"]}, {"use_gitignore": True}])
+def test_max_workers_matches_serial(tree, kwargs):
+    _touch(tree / ".gitignore", "*.txt\n")
+    for idx in range(20):
+        _touch(tree / "many" / f"dir{idx}" / f"file{idx}.py")
+    serial = list(walk_files(tree, **kwargs))
+    parallel = list(walk_files(tree, max_workers=4, **kwargs))
+    assert len(parallel) == len(serial)
+    assert set(parallel) == set(serial)
+
+
+def test_max_workers_stops_early(tree):
+    walker = walk_files(tree, max_workers=2)
+    assert next(walker)
+    walker.close()
+
+
+def test_get_all_filenames(tree):
+    assert sorted(get_all_filenames(str(tree))) == sorted(entry.path for entry in walk_files(str(tree)))
@@ -1,12 +1,185 @@
 """Input/output and logging tools"""
 
+import atexit
+from collections import deque
+import os
 import sys
+import threading
 
 
-def eprint(*args, **kwargs) -> None:
-    """Print to stderr. This isn't fast, so don't use it if performance
-    matters
+# Flush once this many bytes are buffered
+DEFAULT_WRITE_BUFFER_SIZE = 64 * 1024
+# Most buffers passed to a single `os.writev` call
+try:
+    _MAX_WRITEV_BUFFERS = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _MAX_WRITEV_BUFFERS = 1024
+
+
+class BufferedFdWriter:
+    """Batches writes to a file descriptor. Writers only append to a deque (atomic, no lock) and the buffer is written
+    out with as few syscalls as possible: once `buffer_size` bytes are queued, every `flush_interval_s` from a
+    background thread (if given), on `flush`, and at exit.
+    Anything else writing to the same fd (e.g., `print`) can end up out of order with what's still buffered here.
+    """
+
+    def __init__(
+        self,
+        fd: int,
+        buffer_size: int = DEFAULT_WRITE_BUFFER_SIZE,
+        flush_interval_s: float | None = None,
+        use_writev: bool = True,
+    ):
+        self.fd = fd
+        self.buffer_size = buffer_size
+        self.use_writev = use_writev and hasattr(os, "writev")
+        self._pending: deque[bytes] = deque()
+        self._pending_size = 0
+        # Only taken to drain the deque, so writes never wait on each other
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flush_thread = None
+        if flush_interval_s:
+            self._flush_thread = threading.Thread(
+                target=self._flush_periodically, args=(flush_interval_s,), daemon=True
+            )
+            self._flush_thread.start()
+        atexit.register(self.close)
+
+    def write(self, data: bytes | str) -> None:
+        if isinstance(data, str):
+            data = data.encode("UTF-8", errors="backslashreplace")
+        self._pending.append(data)
+        # Racy, but it only decides when to flush
+        self._pending_size += len(data)
+        if self._pending_size >= self.buffer_size:
+            self.flush()
+
+    def _write_all(self, buffers: list[bytes]) -> None:
+        if not self.use_writev:
+            data = memoryview(b"".join(buffers))
+            while data:
+                data = data[os.write(self.fd, data) :]
+            return
+        idx = 0
+        while idx < len(buffers):
+            written = os.writev(self.fd, buffers[idx : idx + _MAX_WRITEV_BUFFERS])
+            # Skip whatever was fully written, and trim a partially written buffer
+            while idx < len(buffers) and written >= len(buffers[idx]):
+                written -= len(buffers[idx])
+                idx += 1
+            if written:
+                buffers[idx] = buffers[idx][written:]
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            buffers = []
+            # popleft until empty (rather than swapping the deque) so concurrent appends are never lost
+            while self._pending:
+                buffers.append(self._pending.popleft())
+            self._pending_size = 0
+            if buffers:
+                self._write_all(buffers)
+
+    def discard(self) -> None:
+        """Drop whatever is buffered without writing it"""
+        self._pending.clear()
+        self._pending_size = 0
+
+    def _flush_periodically(self, interval_s: float) -> None:
+        while not self._stop.wait(interval_s):
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the flush thread and flush. Doesn't close the fd: later writes go straight to it (e.g., from atexit
+        functions that run after this one), since nothing is left to flush them
+        """
+        self.buffer_size = 0
+        self._stop.set()
+        if self._flush_thread:
+            self._flush_thread.join()
+            self._flush_thread = None
+        try:
+            self.flush()
+        except OSError:
+            # E.g., the other end of a pipe went away before exit
+            pass
+        atexit.unregister(self.close)
+
+
+_STDERR_WRITER: BufferedFdWriter | None = None
+_STDERR_WRITER_LOCK = threading.Lock()
+# Set in forked children, whose writes aren't buffered: they usually exit through `os._exit` (e.g., `multiprocessing`
+# workers), which skips the atexit flush
+_UNBUFFERED_STDERR = False
+
+
+def get_stderr_writer() -> BufferedFdWriter:
+    """The shared buffered writer for the real stderr (fd 2) that `eprint` uses"""
+    global _STDERR_WRITER  # pylint: disable=global-statement
+    if _STDERR_WRITER is None:
+        with _STDERR_WRITER_LOCK:
+            if _STDERR_WRITER is None:
+                if _UNBUFFERED_STDERR:
+                    _STDERR_WRITER = BufferedFdWriter(sys.__stderr__.fileno(), buffer_size=0)
+                else:
+                    # flush_interval_s so diagnostics still show up promptly in an idle process
+                    _STDERR_WRITER = BufferedFdWriter(sys.__stderr__.fileno(), flush_interval_s=0.1)
+    return _STDERR_WRITER
+
+
+def _flush_stderr_writer() -> None:
+    if _STDERR_WRITER is not None:
+        try:
+            _STDERR_WRITER.flush()
+        except OSError:
+            pass
+
+
+def _reset_stderr_writer_in_child() -> None:
+    """After a fork, drop the parent's writer (its flush thread doesn't exist in the child) and stop buffering"""
+    global _STDERR_WRITER, _STDERR_WRITER_LOCK, _UNBUFFERED_STDERR  # pylint: disable=global-statement
+    if _STDERR_WRITER is not None:
+        # Whatever is left was the parent's to write
+        _STDERR_WRITER.discard()
+        atexit.unregister(_STDERR_WRITER.close)
+    _STDERR_WRITER = None
+    _STDERR_WRITER_LOCK = threading.Lock()
+    _UNBUFFERED_STDERR = True
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_flush_stderr_writer, after_in_child=_reset_stderr_writer_in_child)
+
+
+def _stderr_is_real() -> bool:
+    """Whether `sys.stderr` is still the process's stderr, i.e., hasn't been replaced (`redirect_stderr`, pytest's
+    capture, ...) with something the buffered fd writer would bypass
+    """
+    if sys.stderr is None or sys.stderr is not sys.__stderr__:
+        return False
+    try:
+        sys.stderr.fileno()
+    except (AttributeError, OSError, ValueError):
+        return False
+    return True
+
+
+def eprint(*args, sep: str | None = " ", end: str | None = "\n", file=None, flush: bool = False) -> None:
+    """Print to stderr, through a buffered writer (see `get_stderr_writer`) instead of `print`. Output is flushed
+    every 100ms, at exit, or immediately with `flush`. Falls back to `print` for a `file` other than stderr, or when
+    `sys.stderr` has been replaced (so redirection and output capture still work). Forked children don't buffer.
+    Without `flush`, output can show up after anything written to stderr since by other means, such as a logging
+    `StreamHandler`: pass `flush=True` where the order matters
     """
-    kwargs = kwargs or {}
-    kwargs["file"] = kwargs.get("file", sys.stderr)
-    print(*args, **kwargs)
+    if (file is not None and file is not sys.stderr) or not _stderr_is_real():
+        # Keep the order with anything still buffered
+        _flush_stderr_writer()
+        print(*args, sep=sep, end=end, file=file if file is not None else sys.stderr, flush=flush)
+        return
+    sep = " " if sep is None else sep
+    end = "\n" if end is None else end
+    writer = get_stderr_writer()
+    writer.write(sep.join(map(str, args)) + end)
+    if flush:
+        writer.flush()
@@ -6,6 +6,15 @@ from mlc.db.manager import DbManager
 from mlc.db.model.logs import LogRecord
 
 
+def _exception_text(record: logging.LogRecord) -> str | None:
+    # Records that went through a queue handler only have the traceback already rendered, in exc_text
+    if record.exc_text:
+        return record.exc_text
+    if record.exc_info:
+        return logging.Formatter().formatException(record.exc_info)
+    return None
+
+
 class DatabaseLogHandler(logging.Handler):
     def __init__(self, db_manager: DbManager):
         super().__init__()
@@ -27,7 +36,7 @@ class DatabaseLogHandler(logging.Handler):
                 pathname=record.pathname,
                 lineno=record.lineno,
                 func=record.funcName,
-                exception=self.formatException(record.exc_info) if record.exc_info else None,
+                exception=_exception_text(record),
             )
             with self.db_manager.get_session() as session:
                 session.add(log)
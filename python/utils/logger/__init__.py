@@ -1,18 +1,44 @@
 """Logging tools"""
 
-from dataclasses import dataclass
+import atexit
+import importlib
 import logging
 import logging.handlers
-from pathlib import Path
 import os
-import shutil
+import queue
 import sys
-import tarfile
 
-import asyncio
+from mlc.utils.io import eprint
 
+from .archive import compress_logs
 from .constants import LOG_ARCHIVE_DIR, LOG_DIR, SYS_LOG_PATH
-from .dt import get_utc_now, get_utc_now_str
+from .dt import get_utc_now, get_utc_now_str, path_dt
+from .filters import LazyEvaluationFilter, LazyMessage, RateLimitFilter, SamplingFilter
+from .formatters import (
+    BINARY_LOG_FORMAT,
+    JSON_LOG_FORMAT,
+    STRUCTURED_LOG_FORMATS,
+    iter_binary_log_records,
+    iter_json_log_records,
+    JsonLinesFormatter,
+)
+from .handlers import (
+    BinaryLogFileHandler,
+    BoundedQueueHandler,
+    BufferedRotatingFileHandler,
+    DEFAULT_LOG_QUEUE_SIZE,
+    RotatingLogFileSettings,
+)
+
+# Names re-exported from submodules that are only imported on first access (see `__getattr__`). Searching archived logs
+# is rare, and `search` pulls in `tarfile`
+_LAZY_EXPORTS = {"index_log_archive": "search", "LogSearchRecord": "search", "query_logs": "search"}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(f".{_LAZY_EXPORTS[name]}", __name__), name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
 
 
 # The logger object that most are expected to use and import
@@ -32,63 +58,42 @@ LOG_LEVEL_STR_TO_INT = {
     "ERROR": logging.ERROR,
     "CRITICAL": logging.CRITICAL,
 }
-
-
-def path_dt() -> str:
-    """Returns a base filename that has current time (UTC) in microseconds"""
-    return f"{int(get_utc_now().timestamp() * 1000000)}"
+# Logger name to the listener thread serving its queue (when `set_up_logger` is called with `async_handlers=True`)
+_QUEUE_LISTENERS: dict[str, logging.handlers.QueueListener] = {}
 
 
 def _generate_log_filename(logger_name: str) -> str:
     return f"{LOG_DIR}/{logger_name}_{path_dt()}.log"
 
 
-def compress_logs(
-    logger_name: str, log_dir: str, archive_dir: str, log_archive_chunk_size: int = 100
-) -> None:
-    if not os.path.isdir(log_dir):
-        # Nothing to compress
-        return
-    os.makedirs(archive_dir, mode=0o750, exist_ok=True)
-
-    chunk_num = 0
-
-    def _compress_files(filenames: list[str]):
-        arcname = f"{logger_name}_log_archive_{chunk_num}_{path_dt()}"
-        os.makedirs(arcname, mode=0o750, exist_ok=True)
-        for filename in filenames:
-            if not filename:
-                break
-            dst_filename = os.path.join(arcname, os.path.basename(filename))
-            os.rename(filename, dst_filename)
-
-        compressed_logs_filename = os.path.join(archive_dir, f"{arcname}.tar.gz")
-        with tarfile.open(compressed_logs_filename, mode="w:gz") as tar_file:
-            tar_file.add(arcname)
-        shutil.rmtree(arcname, ignore_errors=False)
-
-    filenames = [None] * log_archive_chunk_size
-    idx = 0
-    for dir_entry in os.scandir(log_dir):
-        if dir_entry.is_file() and dir_entry.name.lower().endswith(".log"):
-            filenames[idx] = os.path.join(log_dir, dir_entry.name)
-            idx += 1
-
-        if idx >= log_archive_chunk_size:
-            # Compress and reset counters
-            _compress_files(filenames)
-            idx = 0
-            filenames = [None] * log_archive_chunk_size
-            chunk_num += 1
-
-
 def try_compress_logs(
-    logger_name: str, log_dir: str, archive_dir: str, log_archive_chunk_size: int = 100
+    logger_name: str,
+    log_dir: str,
+    archive_dir: str,
+    log_archive_chunk_size: int = 100,
+    codec: str = "GZIP",
+    max_workers: int | None = None,
+    build_index: bool = False,
 ) -> None:
+    """`compress_logs`, but failures are only printed. Archives aren't indexed for search unless `build_index` is set:
+    this runs at startup, and indexing takes far longer than compressing
+    """
+    import tarfile
+
     try:
-        compress_logs(logger_name, LOG_DIR, LOG_ARCHIVE_DIR)
-    except (OSError, ValueError) as exc:
-        eprint(f"Failed to compress log files in '{LOG_DIR}': {exc}")
+        compress_logs(
+            logger_name,
+            log_dir,
+            archive_dir,
+            log_archive_chunk_size,
+            codec=codec,
+            max_workers=max_workers,
+            build_index=build_index,
+        )
+    except (OSError, ValueError, ImportError, RuntimeError, tarfile.TarError) as exc:
+        # Logging still gets set up. ImportError is a codec whose backend is missing, RuntimeError a broken process
+        # pool
+        eprint(f"Failed to compress log files in '{log_dir}': {exc}", flush=True)
 
 
 def _create_trace_log_level(logger: logging.Logger, level_num: int = logging.DEBUG - 5) -> None:
@@ -113,6 +118,41 @@ def _create_trace_log_level(logger: logging.Logger, level_num: int = logging.DEB
     logging.trace = _static_log_func
 
 
+def stop_queue_listener(logger_name: str) -> None:
+    """Stop the listener thread for `logger_name` (if any), flushing all records still queued to the real handlers"""
+    listener = _QUEUE_LISTENERS.pop(logger_name, None)
+    if listener:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.flush()
+
+
+def _stop_all_queue_listeners() -> None:
+    for logger_name in list(_QUEUE_LISTENERS):
+        stop_queue_listener(logger_name)
+
+
+atexit.register(_stop_all_queue_listeners)
+
+
+def _attach_queue_handler(
+    logger: logging.Logger, handlers: list[logging.Handler], queue_size: int, block_on_full: bool
+) -> None:
+    """Put `handlers` behind a listener thread and give `logger` a single handler that only enqueues records. Replaces
+    the queue handler and listener from an earlier call
+    """
+    stop_queue_listener(logger.name)
+    for handler in [handler for handler in logger.handlers if isinstance(handler, BoundedQueueHandler)]:
+        logger.removeHandler(handler)
+        handler.close()
+    log_queue = queue.Queue(maxsize=queue_size)
+    logger.addHandler(BoundedQueueHandler(log_queue, block_on_full=block_on_full))
+    # respect_handler_level so each sink still filters on its own level
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _QUEUE_LISTENERS[logger.name] = listener
+    listener.start()
+
+
 def set_up_logger(
     logger_name: str,
     logger: logging.Logger | None = None,
@@ -125,23 +165,63 @@ def set_up_logger(
     log_level: int | str = logging.INFO,
     log_format: str = DEFAULT_LOG_FORMAT_STR,
     additional_handlers: logging.Handler | list[logging.Handler] | None = None,
+    async_handlers: bool = False,
+    log_queue_size: int = DEFAULT_LOG_QUEUE_SIZE,
+    block_on_full_queue: bool = False,
+    rotating_file: RotatingLogFileSettings | None = None,
+    archive_codec: str = "GZIP",
+    index_log_archives: bool = False,
+    structured_format: str | None = None,
+    log_filters: logging.Filter | list[logging.Filter] | None = None,
+    lazy_messages: bool = False,
 ) -> logging.Logger:
+    """Set up `logger` (defaults to `LOG`) with the requested sinks.
+    With `async_handlers`, the logger only gets a `QueueHandler` and every sink is served by a `QueueListener`
+    thread, so a log call on the calling thread costs one enqueue instead of stdout/disk/syslog I/O. The queue is
+    bounded by `log_queue_size`; when it is full, records are dropped (counted on the queue handler's `dropped`)
+    unless `block_on_full_queue` is set. Queued records are flushed at exit or by `stop_queue_listener`.
+    With `rotating_file`, the file sink is a `BufferedRotatingFileHandler` with those settings instead of a plain
+    `logging.FileHandler`.
+    `structured_format` switches from `log_format` to a structured format: `JSON_LOG_FORMAT` (JSON lines on every sink)
+    or `BINARY_LOG_FORMAT` (length-prefixed binary records, file sink only; other sinks stay text). Read them back with
+    `iter_json_log_records` or `iter_binary_log_records`.
+    `log_filters` (e.g., `SamplingFilter`, `RateLimitFilter`) go on the logger itself, so dropped records never reach
+    any sink. `lazy_messages` adds a `LazyEvaluationFilter` after them, so callables passed as the message are only
+    called for records that are emitted (`LazyMessage` works without it).
+    With `compress_old_logs`, existing logs in `log_dir` are archived first, compressed with `archive_codec`, and with
+    `index_log_archives` also indexed for `query_logs` (which slows down startup by about a second per 10MB of logs).
+    """
     logger = logger or LOG
     logger.name = logger_name
     _create_trace_log_level(logger)
     if isinstance(log_level, str):
         log_level = LOG_LEVEL_STR_TO_INT[log_level.strip().upper()]
     logger.setLevel(log_level)
-    formatter = logging.Formatter(log_format, LOG_RECORD_DATETIME_FORMAT)
+    if structured_format and structured_format not in STRUCTURED_LOG_FORMATS:
+        raise ValueError(
+            f"Unknown structured log format '{structured_format}', expected one of {STRUCTURED_LOG_FORMATS}"
+        )
+    if structured_format == BINARY_LOG_FORMAT and rotating_file:
+        raise ValueError("Binary log records can't be written by the rotating file handler")
+    if structured_format == JSON_LOG_FORMAT:
+        formatter = JsonLinesFormatter(LOG_RECORD_DATETIME_FORMAT)
+    else:
+        formatter = logging.Formatter(log_format, LOG_RECORD_DATETIME_FORMAT)
+
+    if log_filters:
+        if not isinstance(log_filters, list):
+            log_filters = [log_filters]
+        for log_filter in log_filters:
+            logger.addFilter(log_filter)
+    if lazy_messages:
+        logger.addFilter(LazyEvaluationFilter())
 
     if compress_old_logs:
-        try_compress_logs(logger_name, log_dir, archive_dir)
+        try_compress_logs(logger_name, log_dir, archive_dir, codec=archive_codec, build_index=index_log_archives)
 
+    handlers: list[logging.Handler] = []
     if use_stdout:
-        handler = logging.StreamHandler()
-        handler.setFormatter(formatter)
-        handler.setLevel(log_level)
-        logger.addHandler(handler)
+        handlers.append(logging.StreamHandler())
 
     log_filename = None
     if use_file is True:
@@ -154,10 +234,12 @@ def set_up_logger(
         os.makedirs(log_dir, mode=0o750, exist_ok=True)
         os.makedirs(archive_dir, mode=0o750, exist_ok=True)
 
-        handler = logging.FileHandler(log_filename)
-        handler.setFormatter(formatter)
-        handler.setLevel(log_level)
-        logger.addHandler(handler)
+        if structured_format == BINARY_LOG_FORMAT:
+            handlers.append(BinaryLogFileHandler(log_filename))
+        elif rotating_file:
+            handlers.append(BufferedRotatingFileHandler(log_filename, rotating_file))
+        else:
+            handlers.append(logging.FileHandler(log_filename))
 
     if use_syslog:
         platform = sys.platform.lower()
@@ -173,16 +255,21 @@ def set_up_logger(
             handler = logging.handlers.NTEventLogHandler(logger_name)
 
         if handler:
-            handler.setFormatter(formatter)
-            handler.setLevel(log_level)
-            logger.addHandler(handler)
+            handlers.append(handler)
 
     if additional_handlers:
         if not isinstance(additional_handlers, list):
             additional_handlers = [additional_handlers]
-        for handler in additional_handlers:
-            handler.setFormatter(formatter)
-            handler.setLevel(log_level)
+        handlers.extend(additional_handlers)
+
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        handler.setLevel(log_level)
+
+    if async_handlers:
+        _attach_queue_handler(logger, handlers, log_queue_size, block_on_full_queue)
+    else:
+        for handler in handlers:
             logger.addHandler(handler)
 
     return logger
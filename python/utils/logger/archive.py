@@ -0,0 +1,244 @@
+"""Archiving (compressing) old log files"""
+
+from concurrent.futures import Executor, Future
+import json
+import os
+from typing import TYPE_CHECKING
+
+from .dt import get_utc_now_str, path_dt
+from .handlers import COMPRESSED_SEGMENT_EXTENSIONS, compressed_segment_codec
+
+# `tarfile`, `tempfile`, the process pool, and `search` are imported where used: this module is imported with the
+# logger, but only needed when there are logs to archive
+if TYPE_CHECKING:
+    import tarfile
+
+
+# `CompressionType` name to the `tarfile` mode that compresses while streaming, and that mode's level kwarg. Any
+# other codec supported by `compression.compress` is applied to the finished (uncompressed) tar instead
+_TAR_STREAM_MODES: dict[str, tuple[str, str | None]] = {
+    "TAR": ("w", None),
+    "GZIP": ("w:gz", "compresslevel"),
+    "BZ2": ("w:bz2", "compresslevel"),
+    "LZMA": ("w:xz", "preset"),
+}
+# Level used for codecs `tarfile` can't stream when none is given. `compression.compress` otherwise defaults to the
+# codec's max level, which is very slow for zstd
+_DEFAULT_COMPRESS_LEVELS = {"ZSTD": 3, "ZLIB": 6}
+# Appended to in `archive_dir`, one JSON object per archive listing the log files that went into it
+LOG_ARCHIVE_INDEX_FILENAME_TEMPLATE = "{logger_name}_log_archive_index.jsonl"
+
+
+def archive_extension(codec: str) -> str:
+    """Filename extension of a log archive compressed with `codec` (a `CompressionType` name)"""
+    if codec == "TAR":
+        return ".tar"
+    return ".tar" + COMPRESSED_SEGMENT_EXTENSIONS[codec]
+
+
+class _SerialExecutor(Executor):
+    """Runs submitted work immediately. Used unless asked for parallel workers, and when there's only one chunk, where a
+    process pool is pure overhead
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:  # pylint: disable=broad-exception-caught
+            future.set_exception(exc)
+        return future
+
+
+def _add_files(tar_file: "tarfile.TarFile", member_dir: str, filenames: list[str]) -> dict[str, tuple[int, int]]:
+    """Returns member name to (where its data starts in the (uncompressed) tar, its size)"""
+    import tarfile
+
+    offsets = {}
+    for filename in filenames:
+        tinfo = tar_file.gettarinfo(filename, arcname=f"{member_dir}/{os.path.basename(filename)}")
+        with open(filename, "rb") as handle:
+            tar_file.addfile(tinfo, handle)
+        # The data (padded to a whole block) is the last thing written
+        data_blocks = -(-tinfo.size // tarfile.BLOCKSIZE)
+        offsets[tinfo.name] = (tar_file.offset - data_blocks * tarfile.BLOCKSIZE, tinfo.size)
+    return offsets
+
+
+def _write_tar(
+    tar_filename: str, member_dir: str, filenames: list[str], codec: str, level: int | None
+) -> dict[str, tuple[int, int]]:
+    import tarfile
+    import tempfile
+
+    if codec in _TAR_STREAM_MODES:
+        mode, level_kwarg = _TAR_STREAM_MODES[codec]
+        kwargs = {level_kwarg: level} if level is not None and level_kwarg else {}
+        with tarfile.open(tar_filename, mode=mode, **kwargs) as tar_file:
+            return _add_files(tar_file, member_dir, filenames)
+
+    # Imported here since only needed for codecs `tarfile` can't stream
+    from mlc.compression import TYPE_TO_FUNCS, CompressionType, compress
+
+    comp_type = CompressionType[codec]
+    comp_kwargs = {}
+    if level is None:
+        level = _DEFAULT_COMPRESS_LEVELS.get(codec)
+    if level is not None and TYPE_TO_FUNCS[comp_type][2]:
+        comp_kwargs[TYPE_TO_FUNCS[comp_type][2]] = level
+    with tempfile.TemporaryFile() as raw_tar:
+        with tarfile.open(fileobj=raw_tar, mode="w") as tar_file:
+            offsets = _add_files(tar_file, member_dir, filenames)
+        raw_tar.seek(0)
+        compressed = compress(raw_tar.read(), comp_type, comp_kwargs)
+    with open(tar_filename, "wb") as handle:
+        handle.write(compressed)
+    return offsets
+
+
+def _index_chunk(archive_filename: str, filenames: list[str], offsets: dict[str, tuple[int, int]]) -> None:
+    """Write the search index for an archive from the original log files (cheaper than decompressing it again)"""
+    from .search import index_log_member, iter_log_lines, write_log_archive_index
+
+    members = []
+    for filename, (member, (offset, size)) in zip(filenames, offsets.items()):
+        with open(filename, "rb") as handle:
+            entry = index_log_member(member, iter_log_lines(handle, filename), offset, size)
+        if entry:
+            members.append(entry)
+    write_log_archive_index(archive_filename, members)
+
+
+def archive_log_chunk(
+    archive_filename: str,
+    filenames: list[str],
+    codec: str = "GZIP",
+    level: int | None = None,
+    build_index: bool = True,
+) -> list[str]:
+    """Write `filenames` straight into the archive `archive_filename` (no staging copy), then delete them. Members are
+    placed under a directory named after the archive. With `build_index`, the sidecar search index used by
+    `query_logs` is written next to the archive. Returns the member names.
+    Runs in worker processes, so this has to stay a picklable module-level function.
+    """
+    member_dir = os.path.basename(archive_filename).removesuffix(archive_extension(codec))
+    tmp_filename = archive_filename + ".tmp"
+    try:
+        offsets = _write_tar(tmp_filename, member_dir, filenames, codec, level)
+        # Only appears under its real name once complete, and only then are the logs deleted
+        os.replace(tmp_filename, archive_filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+    if build_index:
+        _index_chunk(archive_filename, filenames, offsets)
+    for filename in filenames:
+        os.remove(filename)
+    return list(offsets)
+
+
+def _process_pool(max_workers: int) -> Executor:
+    """Process pool whose workers don't inherit this process's threads (the log queue listener, segment compressor,
+    ...) mid-operation, which forking can deadlock on
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("forkserver"))
+    return ProcessPoolExecutor(max_workers)
+
+
+def _list_log_filenames(log_dir: str) -> list[str]:
+    """`.log` files and compressed log segments. Segments still waiting to be compressed are left alone"""
+    filenames = [
+        dir_entry.path
+        for dir_entry in os.scandir(log_dir)
+        if dir_entry.is_file()
+        and (dir_entry.name.lower().endswith(".log") or compressed_segment_codec(dir_entry.name))
+    ]
+    # Log filenames carry a timestamp, so this keeps each archive to a contiguous time range
+    filenames.sort()
+    return filenames
+
+
+def compress_logs(
+    logger_name: str,
+    log_dir: str,
+    archive_dir: str,
+    log_archive_chunk_size: int = 100,
+    codec: str = "GZIP",
+    level: int | None = None,
+    max_workers: int | None = None,
+    build_index: bool = True,
+) -> list[str]:
+    """Archive every `.log` file (and compressed log segment) in `log_dir` into `archive_dir`, `log_archive_chunk_size`
+    files per archive (the last archive gets whatever is left over). Chunks are compressed one after the other, or in
+    parallel across a process pool when `max_workers` is more than 1. `codec` is a `CompressionType` name. Which log
+    files went into which archive is appended to the index file `LOG_ARCHIVE_INDEX_FILENAME_TEMPLATE` in
+    `archive_dir`, and with `build_index` each archive also gets the sidecar search index used by `query_logs`. Log
+    files are only deleted once their archive is complete. Returns the archive filenames written.
+    """
+    if not os.path.isdir(log_dir):
+        # Nothing to compress
+        return []
+    if log_archive_chunk_size < 1:
+        raise ValueError(f"log_archive_chunk_size must be positive, not {log_archive_chunk_size}")
+    if codec != "TAR" and codec not in COMPRESSED_SEGMENT_EXTENSIONS:
+        raise ValueError(f"Unsupported log archive codec: '{codec}'")
+    if codec not in _TAR_STREAM_MODES:
+        from mlc.compression import CompressionType, is_available
+
+        # Fail before anything is touched, rather than in every worker
+        if not is_available(CompressionType[codec]):
+            raise ImportError(f"Log archive codec '{codec}' is unavailable: its compression backend isn't installed")
+
+    filenames = _list_log_filenames(log_dir)
+    if not filenames:
+        return []
+    import tarfile
+
+    os.makedirs(archive_dir, mode=0o750, exist_ok=True)
+
+    chunks = [
+        filenames[idx : idx + log_archive_chunk_size] for idx in range(0, len(filenames), log_archive_chunk_size)
+    ]
+    parallel = len(chunks) > 1 and max_workers is not None and max_workers > 1
+    executor = _process_pool(max_workers) if parallel else _SerialExecutor()
+    archive_timestamp = path_dt()
+    with executor:
+        futures = {}
+        for chunk_num, chunk in enumerate(chunks):
+            archive_filename = os.path.join(
+                archive_dir, f"{logger_name}_log_archive_{chunk_num}_{archive_timestamp}{archive_extension(codec)}"
+            )
+            futures[archive_filename] = executor.submit(
+                archive_log_chunk, archive_filename, chunk, codec, level, build_index
+            )
+
+        archived = []
+        index_lines = []
+        first_exc = None
+        for archive_filename, future in futures.items():
+            try:
+                members = future.result()
+            except (OSError, ValueError, ImportError, RuntimeError, tarfile.TarError) as exc:
+                # Let the other chunks finish. Their logs were archived and deleted, so they must be indexed.
+                # RuntimeError covers a broken process pool
+                first_exc = first_exc or exc
+                continue
+            index_entry = {
+                "archive": os.path.basename(archive_filename),
+                "created": get_utc_now_str(),
+                "members": members,
+            }
+            index_lines.append(json.dumps(index_entry) + "\n")
+            archived.append(archive_filename)
+    if index_lines:
+        index_filename = os.path.join(archive_dir, LOG_ARCHIVE_INDEX_FILENAME_TEMPLATE.format(logger_name=logger_name))
+        with open(index_filename, "a", encoding="UTF-8") as index_handle:
+            index_handle.writelines(index_lines)
+    if first_exc:
+        raise first_exc
+    return archived
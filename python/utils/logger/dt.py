@@ -7,3 +7,8 @@ def get_utc_now() -> dt:
 
 def get_utc_now_str() -> str:
     return get_utc_now().isoformat()
+
+
+def path_dt() -> str:
+    """Returns a base filename that has current time (UTC) in microseconds"""
+    return f"{int(get_utc_now().timestamp() * 1000000)}"
@@ -0,0 +1,117 @@
+"""Logging filters: lazy message evaluation, sampling, and rate-limiting"""
+
+from abc import ABC, abstractmethod
+import logging
+import threading
+import time
+from typing import Callable
+
+
+# Records from one line of code are counted together
+Callsite = tuple[str, int]
+
+
+def _callsite(record: logging.LogRecord) -> Callsite:
+    return record.pathname, record.lineno
+
+
+class LazyMessage:
+    """A log message (or argument) that's only built if it's actually formatted, i.e., after the record passed level
+    checks and filters. E.g., `LOG.trace("state: %s", LazyMessage(dump_state, obj))`.
+    The result is cached, since every sink formats the same record.
+    """
+
+    __slots__ = ("func", "args", "kwargs", "_value")
+
+    def __init__(self, func: Callable, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self._value = None
+
+    def __str__(self) -> str:
+        if self._value is None:
+            self._value = str(self.func(*self.args, **self.kwargs))
+        return self._value
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class LazyEvaluationFilter(logging.Filter):
+    """Lets a callable be passed as the message itself: `LOG.debug(lambda: f"{expensive()}")`. Must be on the logger
+    (not a handler), where it only runs on records that passed the level check. Add it after any filters that drop
+    records so dropped records are never evaluated.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if callable(record.msg):
+            record.msg = record.msg()
+        return True
+
+
+class _CallsiteDropFilter(logging.Filter, ABC):
+    """Base for filters dropping records per callsite. Records at `exempt_level` or above always pass. Dropped records
+    are counted per callsite in `dropped`.
+    """
+
+    def __init__(self, exempt_level: int = logging.WARNING):
+        super().__init__()
+        self.exempt_level = exempt_level
+        self.dropped: dict[Callsite, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def total_dropped(self) -> int:
+        return sum(self.dropped.values())
+
+    @abstractmethod
+    def _keep(self, callsite: Callsite) -> bool:
+        """Whether to keep the next record from `callsite`. Called with the lock held"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.exempt_level:
+            return True
+        callsite = _callsite(record)
+        with self._lock:
+            if self._keep(callsite):
+                return True
+            self.dropped[callsite] = self.dropped.get(callsite, 0) + 1
+        return False
+
+
+class SamplingFilter(_CallsiteDropFilter):
+    """Keeps 1 in every `every_n` records from each callsite (the first one included)"""
+
+    def __init__(self, every_n: int, exempt_level: int = logging.WARNING):
+        if every_n < 1:
+            raise ValueError(f"every_n must be positive, not {every_n}")
+        super().__init__(exempt_level)
+        self.every_n = every_n
+        self._counts: dict[Callsite, int] = {}
+
+    def _keep(self, callsite: Callsite) -> bool:
+        count = self._counts.get(callsite, 0)
+        self._counts[callsite] = count + 1
+        return count % self.every_n == 0
+
+
+class RateLimitFilter(_CallsiteDropFilter):
+    """Token bucket per callsite: each callsite may log `burst` records at once, refilled at `rate_per_s`"""
+
+    def __init__(self, rate_per_s: float, burst: int = 10, exempt_level: int = logging.WARNING):
+        if rate_per_s <= 0 or burst < 1:
+            raise ValueError(f"rate_per_s and burst must be positive, not {rate_per_s} and {burst}")
+        super().__init__(exempt_level)
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        # Callsite to (tokens, time of last refill)
+        self._buckets: dict[Callsite, tuple[float, float]] = {}
+
+    def _keep(self, callsite: Callsite) -> bool:
+        now = time.monotonic()
+        tokens, last = self._buckets.get(callsite, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate_per_s)
+        keep = tokens >= 1
+        self._buckets[callsite] = (tokens - 1 if keep else tokens, now)
+        return keep
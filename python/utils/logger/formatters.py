@@ -0,0 +1,177 @@
+"""Structured (JSON lines and binary) log record formats, and readers to parse them back"""
+
+import json
+import logging
+import struct
+import time
+from typing import Iterator
+
+
+JSON_LOG_FORMAT = "json"
+BINARY_LOG_FORMAT = "binary"
+STRUCTURED_LOG_FORMATS = (JSON_LOG_FORMAT, BINARY_LOG_FORMAT)
+
+# Binary record layout (little-endian):
+#   u32 length of the rest of the record
+#   f64 created, u16 levelno, u32 process, u64 thread, u32 lineno
+#   u32 x5 byte lengths of name, levelname, pathname, funcName, message (exception text appended to message)
+#   the UTF-8 bytes of those strings, in that order
+_BINARY_RECORD_LEN = struct.Struct("<I")
+_BINARY_RECORD_HEADER = struct.Struct("<dHIQIIIIII")
+_BINARY_STR_FIELDS = ("name", "levelname", "pathname", "funcName", "message")
+
+
+# Quotes and escapes a str as a JSON string, leaving non-ASCII as is (C implementation when available)
+_json_escape = json.encoder.encode_basestring
+
+
+def _json_int(value: int | None) -> str:
+    # `process`/`thread` are None when their collection is turned off in `logging`
+    return "null" if value is None else str(value)
+
+
+class _SecondCache:
+    """Caches the formatted time for the current second, so strftime runs once a second instead of once a record"""
+
+    def __init__(self, converter, datefmt: str):
+        self.converter = converter
+        self.datefmt = datefmt
+        # (second, formatted) in one tuple, read and replaced in one step, so no thread (handlers sharing a formatter
+        # each have their own lock) can see one second paired with another's string
+        self._cached: tuple[int | None, str] = (None, "")
+
+    def format(self, created: float) -> str:
+        second = int(created)
+        cached_second, formatted = self._cached
+        if second != cached_second:
+            formatted = time.strftime(self.datefmt, self.converter(second))
+            self._cached = (second, formatted)
+        return formatted
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats each record as one line of JSON. Same fields as `DEFAULT_LOG_FORMAT_STR`, plus `ts` (epoch seconds) and
+    `exc` (when there's exception info). The line is built directly rather than through a dict and `json.dumps`,
+    timestamps are cached per second, and the few distinct logger/level/file/function names are escaped once.
+    """
+
+    def __init__(self, datefmt: str = "%Y-%m-%dT%H:%M:%S"):
+        super().__init__(datefmt=datefmt)
+        self._times = _SecondCache(self.converter, datefmt)
+        self._escaped: dict[str, str] = {}
+
+    def _escape_cached(self, value: str) -> str:
+        escaped = self._escaped.get(value)
+        if escaped is None:
+            escaped = self._escaped[value] = _json_escape(value)
+        return escaped
+
+    def format(self, record: logging.LogRecord) -> str:
+        escape_cached = self._escape_cached
+        line = (
+            f'{{"name":{escape_cached(record.name)},'
+            f'"time":"{self._times.format(record.created)}.{int(record.msecs):03d}",'
+            f'"ts":{record.created!r},'
+            f'"level":{escape_cached(record.levelname)},'
+            f'"pid":{_json_int(record.process)},'
+            f'"tid":{_json_int(record.thread)},'
+            f'"file":{escape_cached(record.filename)},'
+            f'"line":{record.lineno},'
+            f'"func":{escape_cached(record.funcName or "")},'
+            f'"msg":{_json_escape(record.getMessage())}'
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            return f'{line},"exc":{_json_escape(record.exc_text)}}}'
+        return line + "}"
+
+
+class BinaryRecordFormatter(logging.Formatter):
+    """Formats each record as a compact length-prefixed binary record (see the layout above `_BINARY_RECORD_LEN`).
+    Use `format_bytes`; `format` only exists to satisfy `logging.Formatter` and returns the record's hex.
+    """
+
+    def format_bytes(self, record: logging.LogRecord) -> bytes:
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            message = f"{message}\n{record.exc_text}"
+        strs = [
+            record.name.encode(),
+            record.levelname.encode(),
+            record.pathname.encode(),
+            (record.funcName or "").encode(),
+            message.encode(),
+        ]
+        header = _BINARY_RECORD_HEADER.pack(
+            record.created,
+            record.levelno,
+            record.process or 0,
+            record.thread or 0,
+            record.lineno,
+            *(len(value) for value in strs),
+        )
+        body = b"".join((header, *strs))
+        return _BINARY_RECORD_LEN.pack(len(body)) + body
+
+    def format(self, record: logging.LogRecord) -> str:
+        return self.format_bytes(record).hex()
+
+
+def iter_json_log_records(filename: str) -> Iterator[dict]:
+    """Parse a log file written with `JsonLinesFormatter`, one dict per record"""
+    with open(filename, "r", encoding="UTF-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_binary_log_records(filename: str) -> Iterator[dict]:
+    """Parse a log file written with `BinaryRecordFormatter`, one dict per record. The keys are the `LogRecord`
+    attribute names (`created`, `levelno`, `process`, `thread`, `lineno`, `name`, `levelname`, `pathname`, `funcName`,
+    `message`). A truncated record at the end of the file (e.g., a crash mid-write) is ignored.
+    """
+    with open(filename, "rb") as handle:
+        while len(len_bytes := handle.read(_BINARY_RECORD_LEN.size)) == _BINARY_RECORD_LEN.size:
+            (body_len,) = _BINARY_RECORD_LEN.unpack(len_bytes)
+            body = handle.read(body_len)
+            if len(body) != body_len:
+                return
+            created, levelno, process, thread, lineno, *str_lens = _BINARY_RECORD_HEADER.unpack_from(body)
+            record = {"created": created, "levelno": levelno, "process": process, "thread": thread, "lineno": lineno}
+            offset = _BINARY_RECORD_HEADER.size
+            for field, str_len in zip(_BINARY_STR_FIELDS, str_lens):
+                record[field] = body[offset : offset + str_len].decode()
+                offset += str_len
+            yield record
+
+
+def benchmark_formatters(num_records: int = 100000) -> dict[str, float]:
+    """Records per second formatted by the default text formatter and each structured formatter"""
+    # Imported here to avoid a circular import (the package imports this module)
+    from . import DEFAULT_LOG_FORMAT_STR, LOG_RECORD_DATETIME_FORMAT
+
+    record = logging.LogRecord("bench", logging.INFO, __file__, 1, "message %d with %s", (42, "args"), None, "func")
+    formatters = {
+        "text": logging.Formatter(DEFAULT_LOG_FORMAT_STR, LOG_RECORD_DATETIME_FORMAT).format,
+        JSON_LOG_FORMAT: JsonLinesFormatter().format,
+        BINARY_LOG_FORMAT: BinaryRecordFormatter().format_bytes,
+    }
+    results = {}
+    for name, format_func in formatters.items():
+        start = time.perf_counter()
+        for _ in range(num_records):
+            format_func(record)
+        results[name] = num_records / (time.perf_counter() - start)
+    return results
+
+
+if __name__ == "__main__":
+
+    def _main():
+        for name, records_per_s in benchmark_formatters().items():
+            print(f"{name}: {records_per_s:,.0f} records/s")
+
+    _main()
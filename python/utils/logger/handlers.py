@@ -0,0 +1,314 @@
+"""Logging handlers used by `set_up_logger`"""
+
+import copy
+from dataclasses import dataclass
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+from mlc.utils.io import eprint
+
+from .formatters import BinaryRecordFormatter
+
+
+# Max number of records waiting for the listener thread before records start getting dropped
+DEFAULT_LOG_QUEUE_SIZE = 10000
+# `CompressionType` name to the extension given to a rotated log segment compressed with it
+COMPRESSED_SEGMENT_EXTENSIONS = {
+    "GZIP": ".gz",
+    "ZSTD": ".zst",
+    "LZMA": ".xz",
+    "BZ2": ".bz2",
+    "ZLIB": ".zz",
+}
+# Appended to a rotated segment until it's compressed, so `compress_logs` (which only takes `.log` files and compressed
+# segments) never archives one out from under the compressor thread
+PENDING_SEGMENT_SUFFIX = ".pending"
+
+
+def compressed_segment_codec(filename: str) -> str | None:
+    """`CompressionType` name of a compressed log segment (`<name>.log.<extension>`), else None"""
+    for codec, extension in COMPRESSED_SEGMENT_EXTENSIONS.items():
+        if filename.endswith(".log" + extension):
+            return codec
+    return None
+
+
+# Only used for `formatException`, which doesn't depend on the format
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """`QueueHandler` for a bounded queue. The stdlib version reports a full queue through `handleError`, which prints
+    a traceback to stderr for every record. Here, a full queue either blocks the caller (`block_on_full`) or drops the
+    record and counts it in `dropped`.
+    """
+
+    def __init__(self, log_queue: queue.Queue, block_on_full: bool = False):
+        super().__init__(log_queue)
+        self.block_on_full = block_on_full
+        self.dropped = 0
+
+    def handle(self, record: logging.LogRecord) -> bool | logging.LogRecord:
+        # Skips the handler lock `logging.Handler.handle` takes around `emit`. The queue does its own locking
+        result = self.filter(record)
+        if isinstance(result, logging.LogRecord):
+            # Python 3.12+ filters can return a replacement record
+            record = result
+        if result:
+            self.emit(record)
+        return result
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Only does what has to happen on the calling thread, leaving all formatting to the sinks on the listener
+        thread: merge the args into the message (they could be mutated once the log call returns) and render the
+        traceback (which holds on to every frame) into `exc_text`. The stdlib version also formats the whole record.
+        Works on a copy, since the caller's record can still go to other handlers (e.g., propagating to root's)
+        """
+        record = copy.copy(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.block_on_full:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Not locked. An occasional miscount is cheaper than taking a lock on the hot path
+            self.dropped += 1
+
+
+@dataclass
+class RotatingLogFileSettings:
+    """Settings for `BufferedRotatingFileHandler`"""
+
+    # Rotate once the current file reaches this many bytes. None to disable
+    max_bytes: int | None = 64 * 1024 * 1024
+    # Rotate once the current file has been open this many seconds. None to disable
+    rotate_interval_s: float | None = 24 * 60 * 60
+    # Size of the write buffer in front of the file
+    buffer_size: int = 1024 * 1024
+    # Flush and fsync whatever was written (from a background thread) this often. None to leave it to the OS
+    fsync_interval_s: float | None = 5.0
+    # Flush records at this level or above to the OS right away, so they survive the process being killed. None to
+    # only flush on the interval
+    flush_level: int | None = logging.WARNING
+    # `CompressionType` name used on rotated segments (one of `COMPRESSED_SEGMENT_EXTENSIONS`). None to not compress
+    compression: str | None = "ZSTD"
+    # Passed through to `compression.compress`. None uses that module's default (max) level, which is slow for zstd
+    compression_level: int | None = 3
+
+
+class _SegmentCompressor:
+    """Background thread compressing rotated log segments so rotation never waits on compression"""
+
+    def __init__(self, compression: str, compression_level: int | None):
+        if compression not in COMPRESSED_SEGMENT_EXTENSIONS:
+            raise ValueError(f"Unsupported log segment compression: '{compression}'")
+        from mlc.compression import CompressionType, TYPE_TO_FUNCS
+
+        # Raises ImportError now, rather than on the thread, if the codec's backend is missing
+        self._level_kwarg = TYPE_TO_FUNCS[CompressionType[compression]][2]
+        self.compression = compression
+        self.compression_level = compression_level
+        self._segments = queue.Queue()
+        self._thread = threading.Thread(target=self._compress_segments, daemon=True)
+        self._thread.start()
+
+    def submit(self, segment_filename: str) -> None:
+        self._segments.put(segment_filename)
+
+    def close(self) -> None:
+        """Compress everything submitted so far, then stop the thread"""
+        self._segments.put(None)
+        self._thread.join()
+
+    def _compress_segments(self) -> None:
+        from mlc.compression import CompressionType, compress
+
+        comp_type = CompressionType[self.compression]
+        kwargs = {}
+        if self.compression_level is not None and self._level_kwarg:
+            kwargs[self._level_kwarg] = self.compression_level
+        extension = COMPRESSED_SEGMENT_EXTENSIONS[self.compression]
+
+        while (pending_filename := self._segments.get()) is not None:
+            segment_filename = pending_filename.removesuffix(PENDING_SEGMENT_SUFFIX)
+            compressed_filename = segment_filename + extension
+            tmp_filename = compressed_filename + ".tmp"
+            try:
+                with open(pending_filename, "rb") as handle:
+                    data = handle.read()
+                compressed = compress(data, comp_type, dict(kwargs))
+                with open(tmp_filename, "wb") as handle:
+                    handle.write(compressed)
+                # Rename last so a crash never leaves a truncated compressed segment behind
+                os.replace(tmp_filename, compressed_filename)
+                os.remove(pending_filename)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                # Keep the thread alive for the next segment. The segment is archived uncompressed instead
+                eprint(f"Failed to compress log segment '{segment_filename}': {exc}", flush=True)
+                try:
+                    if os.path.exists(tmp_filename):
+                        os.remove(tmp_filename)
+                    os.replace(pending_filename, segment_filename)
+                except OSError:
+                    pass
+
+
+class BufferedRotatingFileHandler(logging.Handler):
+    """File handler for high log volume. Writes go through a large buffer with periodic fsync (from a background
+    thread, so records don't sit in the buffer while idle) instead of a flush per record. The file is rotated on size
+    and/or age: the current file is renamed to a timestamped segment and a new one is opened, and the segment is
+    handed to a background thread to be compressed. Rotation itself is only a rename and an open, so it never stalls
+    the writer on compression.
+    """
+
+    def __init__(self, filename: str, settings: RotatingLogFileSettings | None = None):
+        super().__init__()
+        self.baseFilename = os.path.abspath(filename)
+        self.settings = settings or RotatingLogFileSettings()
+        self._compressor = None
+        if self.settings.compression:
+            try:
+                self._compressor = _SegmentCompressor(self.settings.compression, self.settings.compression_level)
+            except ImportError as exc:
+                # Still log, just without compressing rotated segments
+                eprint(f"Not compressing rotated log segments: {exc}", flush=True)
+            else:
+                self._resubmit_pending_segments()
+        self._stream = None
+        self._bytes_written = 0
+        self._opened_at = 0.0
+        # Whether anything was written since the last fsync
+        self._unsynced = False
+        self._open()
+        self._stop = threading.Event()
+        self._sync_thread = None
+        if self.settings.fsync_interval_s:
+            self._sync_thread = threading.Thread(
+                target=self._sync_periodically, args=(self.settings.fsync_interval_s,), daemon=True
+            )
+            self._sync_thread.start()
+
+    def _open(self) -> None:
+        self._stream = open(self.baseFilename, "a", encoding="UTF-8", buffering=self.settings.buffer_size)
+        self._bytes_written = self._stream.tell()
+        self._opened_at = time.monotonic()
+
+    def _sync(self) -> None:
+        self._stream.flush()
+        os.fsync(self._stream.fileno())
+        self._unsynced = False
+
+    def _sync_periodically(self, interval_s: float) -> None:
+        while not self._stop.wait(interval_s):
+            with self.lock:
+                if not self._unsynced or not self._stream or self._stream.closed:
+                    continue
+                try:
+                    self._sync()
+                except OSError as exc:
+                    # E.g., the disk is full. Keep trying on the next interval
+                    eprint(f"Failed to sync log file '{self.baseFilename}': {exc}", flush=True)
+
+    def _should_rotate(self, now: float) -> bool:
+        max_bytes = self.settings.max_bytes
+        interval = self.settings.rotate_interval_s
+        return bool(
+            (max_bytes and self._bytes_written >= max_bytes)
+            or (interval and now - self._opened_at >= interval)
+        )
+
+    def _segment_filename(self) -> str:
+        root, ext = os.path.splitext(self.baseFilename)
+        # Microseconds, like the rest of the log filenames
+        return f"{root}_{time.time_ns() // 1000}{ext}"
+
+    def _resubmit_pending_segments(self) -> None:
+        """Compress the segments a previous run (with the same log file) rotated but didn't get to compress"""
+        log_dir = os.path.dirname(self.baseFilename)
+        prefix = os.path.splitext(os.path.basename(self.baseFilename))[0] + "_"
+        for dir_entry in os.scandir(log_dir):
+            if dir_entry.name.startswith(prefix) and dir_entry.name.endswith(PENDING_SEGMENT_SUFFIX):
+                self._compressor.submit(dir_entry.path)
+
+    def rotate(self) -> None:
+        """Close the current file, rename it to a segment, and start a new file. Segments waiting to be compressed
+        carry `PENDING_SEGMENT_SUFFIX`
+        """
+        with self.lock:
+            self._stream.close()
+            segment_filename = self._segment_filename()
+            if self._compressor:
+                segment_filename += PENDING_SEGMENT_SUFFIX
+            os.rename(self.baseFilename, segment_filename)
+            self._open()
+        if self._compressor:
+            self._compressor.submit(segment_filename)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            msg = self.format(record) + "\n"
+            self._stream.write(msg)
+            # Characters rather than encoded bytes, but close enough for a rotation threshold
+            self._bytes_written += len(msg)
+            self._unsynced = True
+            if self._should_rotate(time.monotonic()):
+                self.rotate()
+            elif self.settings.flush_level is not None and record.levelno >= self.settings.flush_level:
+                self._stream.flush()
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handleError(record)
+
+    def flush(self) -> None:
+        with self.lock:
+            if self._stream and not self._stream.closed:
+                self._stream.flush()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._sync_thread:
+            self._sync_thread.join()
+            self._sync_thread = None
+        with self.lock:
+            if self._stream and not self._stream.closed:
+                self._sync()
+                self._stream.close()
+        if self._compressor:
+            self._compressor.close()
+            self._compressor = None
+        super().close()
+
+
+class BinaryLogFileHandler(logging.FileHandler):
+    """File handler writing `BinaryRecordFormatter` records. Read the file back with `iter_binary_log_records`"""
+
+    def __init__(self, filename: str, delay: bool = False):
+        super().__init__(filename, mode="ab", delay=delay)
+        self.setFormatter(BinaryRecordFormatter())
+
+    def setFormatter(self, fmt: logging.Formatter | None) -> None:
+        # `set_up_logger` sets the same (text) formatter on every sink. Binary is the only format this can write
+        if isinstance(fmt, BinaryRecordFormatter):
+            super().setFormatter(fmt)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.formatter.format_bytes(record))
+            self.flush()
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handleError(record)
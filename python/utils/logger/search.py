@@ -0,0 +1,337 @@
+"""Indexing and searching archived logs.
+Each archive written by `compress_logs` gets a sidecar index (`<archive>.idx.json`) recording, for every member log
+file, its time range, highest level, logger names, and a bloom filter of the trigrams of the words in its records.
+`query_logs` uses the sidecars to only decompress and scan the members that can possibly match.
+"""
+
+import base64
+from dataclasses import dataclass
+from datetime import datetime as dt
+import io
+import json
+import logging
+import os
+import re
+import tarfile
+import time
+from typing import IO, Iterable, Iterator
+import zlib
+
+from .handlers import COMPRESSED_SEGMENT_EXTENSIONS, compressed_segment_codec
+
+
+LOG_ARCHIVE_INDEX_SUFFIX = ".idx.json"
+_BLOOM_NUM_HASHES = 7
+_BLOOM_BITS_PER_ITEM = 10
+_BLOOM_MIN_BITS = 1024
+# Caps the sidecar size for huge members, at the cost of more false positives
+_BLOOM_MAX_BITS = 1 << 20
+# The text format is `DEFAULT_LOG_FORMAT_STR`: name|time.msecs|level|pid:tid|file:line|func: message
+_TEXT_LOG_LINE_RE = re.compile(
+    r"(?P<name>[^|]*)\|(?P<second>\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)\.(?P<msecs>\d{3})\|(?P<level>[^|]*)\|[^|]*\|[^|]*\|"
+    r"[^:]*: (?P<msg>.*)"
+)
+
+
+@dataclass
+class LogSearchRecord:
+    """A log record found by `query_logs`. `text` is the full original text, including continuation lines such as
+    tracebacks
+    """
+
+    archive: str
+    member: str
+    timestamp: float
+    levelno: int
+    name: str
+    message: str
+    text: str
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings, serializable to base64"""
+
+    def __init__(self, num_bits: int, bits: bytearray | None = None):
+        self.num_bits = num_bits
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+
+    @classmethod
+    def for_items(cls, items: set[str]) -> "BloomFilter":
+        bloom = cls(min(_BLOOM_MAX_BITS, max(_BLOOM_MIN_BITS, len(items) * _BLOOM_BITS_PER_ITEM)))
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # Double hashing. Deterministic across processes, unlike `hash()`
+        data = item.encode()
+        hash1 = zlib.crc32(data)
+        hash2 = zlib.adler32(data) | 1
+        for idx in range(_BLOOM_NUM_HASHES):
+            yield (hash1 + idx * hash2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def to_json(self) -> dict:
+        return {"num_bits": self.num_bits, "bits": base64.b64encode(self.bits).decode()}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "BloomFilter":
+        return cls(data["num_bits"], bytearray(base64.b64decode(data["bits"])))
+
+
+# Words (of at least 3 characters) whose trigrams go in the bloom filter. ASCII-only is faster, and still finds every
+# word of a query inside the words of any text containing it
+_WORD_RE = re.compile(r"\w{3,}", re.ASCII)
+
+
+def _word_trigrams(words: Iterable[str]) -> set[str]:
+    """Trigrams within each (lowercase) word. Any text containing a query also contains the trigrams of the query's
+    words (only its first and last word can be partial, and a partial word's trigrams are still in the full word)
+    """
+    return {word[idx : idx + 3] for word in words for idx in range(len(word) - 2)}
+
+
+def _level_number(level_name: str) -> int:
+    level = logging.getLevelName(level_name)
+    return level if isinstance(level, int) else logging.NOTSET
+
+
+class _LineParser:
+    """Parses the first line of a record in the text or JSON lines format into (timestamp, levelno, name, message).
+    Timestamps only have to be converted once per second of logs
+    """
+
+    def __init__(self):
+        self._second = None
+        self._second_ts = 0.0
+
+    def parse(self, line: str) -> tuple[float, int, str, str] | None:
+        if line.startswith("{"):
+            try:
+                fields = json.loads(line)
+                return fields["ts"], _level_number(fields["level"]), fields["name"], fields["msg"]
+            except (ValueError, KeyError, TypeError):
+                return None
+        match = _TEXT_LOG_LINE_RE.match(line)
+        if not match:
+            return None
+        second = match["second"]
+        if second != self._second:
+            # Text logs use local time, like `logging.Formatter`
+            self._second_ts = time.mktime(time.strptime(second, "%Y-%m-%dT%H:%M:%S"))
+            self._second = second
+        timestamp = self._second_ts + int(match["msecs"]) / 1000
+        return timestamp, _level_number(match["level"]), match["name"], match["msg"]
+
+
+def _iter_records(lines: Iterable[str]) -> Iterator[tuple[tuple[float, int, str, str], str]]:
+    """Group lines into records: a line that parses starts a record and lines that don't are appended to it. Lines
+    before the first record are skipped
+    """
+    parser = _LineParser()
+    parsed = None
+    text_lines = []
+    for line in lines:
+        line = line.rstrip("\n")
+        line_parsed = parser.parse(line)
+        if line_parsed is None:
+            if parsed:
+                text_lines.append(line)
+            continue
+        if parsed:
+            yield parsed, "\n".join(text_lines)
+        parsed = line_parsed
+        text_lines = [line]
+    if parsed:
+        yield parsed, "\n".join(text_lines)
+
+
+def index_log_member(
+    member: str, lines: Iterable[str], offset: int | None = None, size: int | None = None
+) -> dict | None:
+    """Index entry for one member (log file) of an archive. `offset` is where the member's data starts in the
+    (uncompressed) tar and `size` its size, which lets `query_logs` read it directly out of an uncompressed archive.
+    Returns None when nothing in it parses as a log record
+    """
+    start = end = None
+    max_level = logging.NOTSET
+    names = set()
+    # Logs repeat the same text over and over, so words are only looked for in distinct whitespace-separated tokens,
+    # and trigrams only computed once per distinct word
+    tokens = set()
+    for (timestamp, levelno, name, _), text in _iter_records(lines):
+        start = timestamp if start is None else min(start, timestamp)
+        end = timestamp if end is None else max(end, timestamp)
+        max_level = max(max_level, levelno)
+        names.add(name)
+        tokens.update(text.lower().split())
+    if start is None:
+        return None
+    return {
+        "member": member,
+        "offset": offset,
+        "size": size,
+        "start": start,
+        "end": end,
+        "max_level": max_level,
+        "names": sorted(names),
+        "bloom": BloomFilter.for_items(_word_trigrams(set(_WORD_RE.findall(" ".join(tokens))))).to_json(),
+    }
+
+
+def write_log_archive_index(archive_filename: str, members: list[dict]) -> None:
+    """Write the sidecar index for `archive_filename` (atomically, so readers never see a partial index)"""
+    index_filename = archive_filename + LOG_ARCHIVE_INDEX_SUFFIX
+    with open(index_filename + ".tmp", "w", encoding="UTF-8") as handle:
+        json.dump({"archive": os.path.basename(archive_filename), "members": members}, handle)
+    os.replace(index_filename + ".tmp", index_filename)
+
+
+def _archive_codec(archive_filename: str) -> str | None:
+    """`CompressionType` name of an archive that `tarfile` can't read itself, else None"""
+    for codec, extension in COMPRESSED_SEGMENT_EXTENSIONS.items():
+        if codec not in ("GZIP", "BZ2", "LZMA") and archive_filename.endswith(".tar" + extension):
+            return codec
+    return None
+
+
+def _open_archive_stream(archive_filename: str) -> tarfile.TarFile:
+    """Open an archive for one sequential pass over its members"""
+    codec = _archive_codec(archive_filename)
+    if not codec:
+        return tarfile.open(archive_filename, mode="r|*")
+    # Imported here since only needed for codecs `tarfile` can't read
+    from mlc.compression import CompressionType, decompress
+
+    with open(archive_filename, "rb") as handle:
+        data = decompress(handle.read(), CompressionType[codec])
+    return tarfile.open(fileobj=io.BytesIO(data), mode="r|")
+
+
+def iter_log_lines(handle: IO[bytes], filename: str) -> Iterator[str]:
+    """Lines of a log file (or archive member) named `filename`, decompressing it first if it's a compressed segment"""
+    codec = compressed_segment_codec(filename)
+    if codec:
+        from mlc.compression import CompressionType, decompress
+
+        handle = io.BytesIO(decompress(handle.read(), CompressionType[codec]))
+    for line in handle:
+        yield line.decode("UTF-8", errors="replace")
+
+
+def index_log_archive(archive_filename: str) -> list[dict]:
+    """Build and write the sidecar index of an existing archive (e.g., one written before indexing existed)"""
+    members = []
+    with _open_archive_stream(archive_filename) as tar_file:
+        for tinfo in tar_file:
+            if not tinfo.isfile():
+                continue
+            lines = iter_log_lines(tar_file.extractfile(tinfo), tinfo.name)
+            entry = index_log_member(tinfo.name, lines, tinfo.offset_data, tinfo.size)
+            if entry:
+                members.append(entry)
+    write_log_archive_index(archive_filename, members)
+    return members
+
+
+def _iter_archive_members(archive_filename: str, entries: list[dict]) -> Iterator[tuple[str, Iterator[str]]]:
+    """(member name, lines) of the members of `archive_filename` that have an index entry in `entries`. Members of an
+    uncompressed tar are read straight from their recorded offsets. Otherwise, the archive is decompressed as far as
+    the last of them
+    """
+    if not entries:
+        return
+    if archive_filename.endswith(".tar") and all(entry.get("size") is not None for entry in entries):
+        with open(archive_filename, "rb") as handle:
+            for entry in sorted(entries, key=lambda entry: entry["offset"]):
+                handle.seek(entry["offset"])
+                data = io.BytesIO(handle.read(entry["size"]))
+                yield entry["member"], iter_log_lines(data, entry["member"])
+        return
+
+    members = {entry["member"] for entry in entries}
+    with _open_archive_stream(archive_filename) as tar_file:
+        for tinfo in tar_file:
+            if tinfo.name not in members:
+                continue
+            yield tinfo.name, iter_log_lines(tar_file.extractfile(tinfo), tinfo.name)
+            members.discard(tinfo.name)
+            if not members:
+                # The rest of the archive doesn't need to be decompressed
+                break
+
+
+def _to_timestamp(value: dt | float | None) -> float | None:
+    if isinstance(value, dt):
+        return value.timestamp()
+    return value
+
+
+def query_logs(
+    archive_dir: str,
+    start: dt | float | None = None,
+    end: dt | float | None = None,
+    min_level: int | str | None = None,
+    contains: str | None = None,
+    logger_name: str | None = None,
+) -> Iterator[LogSearchRecord]:
+    """Find archived log records logged between `start` and `end` (inclusive), at `min_level` or above, whose text
+    contains `contains` (case-insensitive), from logger `logger_name`. Every criterion is optional.
+    Only archives with a sidecar index are searched (`set_up_logger` only writes them with `index_log_archives`; see
+    `index_log_archive` for the others), and only the members
+    whose index entry can match are decompressed and scanned. Archives are searched in order of their earliest record.
+    """
+    start = _to_timestamp(start)
+    end = _to_timestamp(end)
+    if isinstance(min_level, str):
+        min_level = _level_number(min_level.strip().upper())
+    contains = contains.lower() if contains else None
+    query_trigrams = _word_trigrams(_WORD_RE.findall(contains)) if contains else set()
+
+    def _member_may_match(entry: dict) -> bool:
+        if start is not None and entry["end"] < start:
+            return False
+        if end is not None and entry["start"] > end:
+            return False
+        if min_level is not None and entry["max_level"] < min_level:
+            return False
+        if logger_name is not None and logger_name not in entry["names"]:
+            return False
+        if query_trigrams:
+            bloom = BloomFilter.from_json(entry["bloom"])
+            return all(trigram in bloom for trigram in query_trigrams)
+        return True
+
+    def _record_matches(timestamp: float, levelno: int, name: str, text: str) -> bool:
+        return (
+            (start is None or timestamp >= start)
+            and (end is None or timestamp <= end)
+            and (min_level is None or levelno >= min_level)
+            and (logger_name is None or name == logger_name)
+            and (contains is None or contains in text.lower())
+        )
+
+    indexes = []
+    for dir_entry in os.scandir(archive_dir):
+        if not dir_entry.name.endswith(LOG_ARCHIVE_INDEX_SUFFIX):
+            continue
+        with open(dir_entry.path, "r", encoding="UTF-8") as handle:
+            index = json.load(handle)
+        if index["members"]:
+            archive_filename = dir_entry.path.removesuffix(LOG_ARCHIVE_INDEX_SUFFIX)
+            indexes.append((min(entry["start"] for entry in index["members"]), archive_filename, index))
+    # Filenames don't sort in time order (chunk numbers aren't padded, and several loggers can share a directory)
+    indexes.sort(key=lambda item: item[:2])
+
+    for _, archive_filename, index in indexes:
+        entries = [entry for entry in index["members"] if _member_may_match(entry)]
+        for member, lines in _iter_archive_members(archive_filename, entries):
+            for (timestamp, levelno, name, message), text in _iter_records(lines):
+                if _record_matches(timestamp, levelno, name, text):
+                    yield LogSearchRecord(index["archive"], member, timestamp, levelno, name, message, text)